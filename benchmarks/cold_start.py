@@ -0,0 +1,142 @@
+"""Cold-start benchmark: how long a fresh API process takes to serve its first requests.
+
+For each run it starts a new `uvicorn main:app` process against the mock LLM
+server and records the time from spawn until `/health` answers and until the
+first `/generate` completes, plus the time to `import main` on its own. Use
+`--max-first-request` to fail (exit 1) when startup regresses.
+
+    python benchmarks/cold_start.py --runs 5 --max-first-request 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+from typing import Dict, List, Optional
+import httpx
+from fixtures import build_resumes, job_description
+from run_benchmark import (
+    BENCHMARK_DIR, ROOT, app_environment, current_commit, free_port, start_app, start_mock_server
+)
+
+IMPORT_TIMER = "import time; started = time.perf_counter(); import main; print(time.perf_counter() - started)"
+
+
+def wait_for(url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError(f"Process exited while waiting for {url}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Timed out waiting for {url}")
+        time.sleep(0.01)
+
+
+def measure_import(env: Dict[str, str]) -> float:
+    output = subprocess.check_output(
+        [sys.executable, "-c", IMPORT_TIMER], cwd=os.path.join(ROOT, "src"), env=env, text=True,
+        stderr=subprocess.DEVNULL
+    )
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_start(mock_url: str, env: Dict[str, str], resume, timeout: float) -> Dict[str, float]:
+    port = free_port()
+    app_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = start_app(port, env)
+    try:
+        wait_for(f"{app_url}/health", process, timeout)
+        healthy = time.perf_counter() - started
+        filename, content, content_type = resume
+        response = httpx.post(
+            f"{app_url}/generate",
+            files={"resume": (filename, content, content_type)},
+            data={
+                "job_description": json.dumps({"text": job_description(0)}),
+                "model_provider": "openai",
+                "use_cache": "false"
+            },
+            timeout=timeout
+        )
+        response.raise_for_status()
+        first_request = time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return {"health": healthy, "first_request": first_request}
+
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        "median": round(statistics.median(values), 3),
+        "min": round(min(values), 3),
+        "max": round(max(values), 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--max-first-request", type=float,
+                        help="Exit with status 1 if the median time to the first /generate exceeds this")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/cold-start-<timestamp>-<commit>.json)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="resume-cold-start-")
+    mock_port = free_port()
+    mock_url = f"http://127.0.0.1:{mock_port}"
+    # A fast mock keeps the measurement about startup rather than generation
+    mock = start_mock_server(mock_port, latency=0.0, tokens_per_second=100000, completion_tokens=20)
+    env = app_environment(mock_url, workdir)
+    resume = build_resumes(1)[0]
+    imports, health, first_request = [], [], []
+    try:
+        wait_for(f"{mock_url}/stats", mock, args.timeout)
+        for run in range(args.runs):
+            imports.append(measure_import(env))
+            # A fresh cache directory per run so the first request parses the resume
+            timings = measure_start(mock_url, {**env, "CACHE_DIR": os.path.join(workdir, f"cache-{run}")},
+                                    resume, args.timeout)
+            health.append(timings["health"])
+            first_request.append(timings["first_request"])
+            print(f"run {run + 1}: import={imports[-1]:.3f}s health={health[-1]:.3f}s "
+                  f"first_request={first_request[-1]:.3f}s", flush=True)
+    finally:
+        mock.terminate()
+        mock.wait(timeout=10)
+
+    results = {
+        "commit": current_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "runs": args.runs,
+        "import_seconds": summarize(imports),
+        "time_to_health_seconds": summarize(health),
+        "time_to_first_request_seconds": summarize(first_request)
+    }
+    output = args.output or os.path.join(
+        BENCHMARK_DIR, "results", f"cold-start-{time.strftime('%Y%m%d-%H%M%S')}-{results['commit'] or 'unknown'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as result_file:
+        json.dump(results, result_file, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+    median = results["time_to_first_request_seconds"]["median"]
+    if args.max_first_request is not None and median > args.max_first_request:
+        print(f"Median time to first request {median}s exceeds {args.max_first_request}s", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
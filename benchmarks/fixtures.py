@@ -0,0 +1,138 @@
+"""Deterministic fixture corpus for the benchmarks: resumes (PDF/DOCX) and job pages (HTML).
+
+Fixtures are generated rather than checked in so the corpus size can be
+varied from the command line and no binary files live in the repository.
+"""
+import io
+import os
+import random
+from typing import List, Tuple
+import docx
+
+SKILLS = [
+    "Python", "FastAPI", "PostgreSQL", "Redis", "Kubernetes", "Terraform", "React", "TypeScript",
+    "AWS", "GCP", "Kafka", "Airflow", "Spark", "Docker", "GraphQL", "Go", "Rust", "Django"
+]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+TITLES = ["Software Engineer", "Backend Engineer", "Data Engineer", "Platform Engineer", "Site Reliability Engineer"]
+
+
+def resume_lines(index: int, pages: int = 2) -> List[List[str]]:
+    """Lines of text for a resume, split into pages."""
+    rng = random.Random(index)
+    name = f"Candidate {index}"
+    lines = [name, f"{rng.choice(TITLES)} | candidate{index}@example.com | +1 555 010 {index:04d}", "", "Summary"]
+    lines.append(f"Engineer with {rng.randint(2, 15)} years of experience building reliable services.")
+    lines.append("")
+    lines.append("Experience")
+    for _ in range(pages * 4):
+        company = rng.choice(COMPANIES)
+        lines.append(f"{rng.choice(TITLES)}, {company} ({rng.randint(2005, 2020)} - {rng.randint(2021, 2025)})")
+        for _ in range(4):
+            lines.append(
+                f"- Built {rng.choice(SKILLS)} and {rng.choice(SKILLS)} systems serving "
+                f"{rng.randint(1, 900)}k requests per day, cutting latency by {rng.randint(5, 60)}%"
+            )
+    lines.append("")
+    lines.append("Skills")
+    lines.append(", ".join(rng.sample(SKILLS, 8)))
+    per_page = max(1, len(lines) // pages + 1)
+    return [lines[start:start + per_page] for start in range(0, len(lines), per_page)]
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """Write a minimal text-only PDF with one Helvetica content stream per page."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{4 + 2 * i} 0 R' for i in range(len(pages)))}] "
+        f"/Count {len(pages)} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    for number, lines in enumerate(pages):
+        content = "BT /F1 10 Tf 50 750 Td 13 TL " + " ".join(f"({_pdf_escape(line)}) Tj T*" for line in lines) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * number} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream".encode())
+
+    output = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects):
+        offsets.append(len(output))
+        output += f"{number + 1} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF".encode()
+    return output
+
+
+def make_docx(pages: List[List[str]]) -> bytes:
+    document = docx.Document()
+    for lines in pages:
+        for line in lines:
+            document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def build_resumes(count: int, pages: int = 2) -> List[Tuple[str, bytes, str]]:
+    """Return `(filename, content, content_type)` for `count` resumes, alternating PDF and DOCX."""
+    resumes = []
+    for index in range(count):
+        lines = resume_lines(index, pages)
+        if index % 2 == 0:
+            resumes.append((f"resume-{index}.pdf", make_pdf(lines), "application/pdf"))
+        else:
+            resumes.append((
+                f"resume-{index}.docx", make_docx(lines),
+                "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+            ))
+    return resumes
+
+
+def job_description(index: int) -> str:
+    rng = random.Random(10_000 + index)
+    skills = rng.sample(SKILLS, 6)
+    lines = [
+        f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)}",
+        "About the role",
+        f"We are looking for an engineer to own our {skills[0]} and {skills[1]} platform.",
+        "Responsibilities"
+    ]
+    lines += [f"Design, build and operate {skill} services at scale." for skill in skills[2:]]
+    lines.append("Requirements")
+    lines += [f"{rng.randint(2, 8)}+ years with {skill}." for skill in skills]
+    return "\n".join(lines)
+
+
+def job_page_html(index: int) -> str:
+    """A job posting wrapped in the navigation, cookie banner and footer of a typical careers site."""
+    paragraphs = "".join(f"<p>{line}</p>" for line in job_description(index).splitlines())
+    return (
+        "<!doctype html><html><head><title>Careers</title>"
+        "<style>body{font-family:sans-serif}</style><script>window.analytics=[];</script></head><body>"
+        "<nav><a href='/'>Home</a><a href='/jobs'>Jobs</a><a href='/login'>Sign in</a></nav>"
+        "<div class='cookie-banner'>We use cookies to improve your experience. Accept all</div>"
+        f"<main><article class='job-description'>{paragraphs}</article></main>"
+        "<aside>Similar jobs</aside>"
+        "<footer>Copyright 2024 Example Careers. All rights reserved. Privacy policy</footer>"
+        "</body></html>"
+    )
+
+
+def write_corpus(directory: str, resumes: int = 10, jobs: int = 10):
+    """Write the corpus to disk, e.g. to inspect it or use it with other load tools."""
+    os.makedirs(directory, exist_ok=True)
+    for filename, content, _ in build_resumes(resumes):
+        with open(os.path.join(directory, filename), "wb") as output:
+            output.write(content)
+    for index in range(jobs):
+        with open(os.path.join(directory, f"job-{index}.html"), "w") as output:
+            output.write(job_page_html(index))
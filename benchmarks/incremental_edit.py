@@ -0,0 +1,122 @@
+"""Iterative-edit benchmark: cost of regenerating after small changes to the job description.
+
+Sends the same resume with a job description that changes one requirement per
+step, once per generation mode, and records per-step latency, LLM calls and
+the prompt/completion tokens reported to the app's `/metrics`. `sections`
+mode should only call the LLM for the parts of the resume an edit touches.
+
+    python benchmarks/incremental_edit.py --edits 5 --modes split,sections
+"""
+import os
+import json
+import time
+import argparse
+import statistics
+import tempfile
+from typing import Dict, List
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+from fixtures import SKILLS, build_resumes, job_description
+from run_benchmark import (
+    BENCHMARK_DIR, app_environment, current_commit, free_port, start_app, start_mock_server
+)
+from cold_start import wait_for
+
+
+def llm_totals(metrics_text: str) -> Dict[str, float]:
+    totals = {"prompt": 0.0, "completion": 0.0, "calls": 0.0}
+    for family in text_string_to_metric_families(metrics_text):
+        for sample in family.samples:
+            if sample.name == "resume_generator_llm_tokens_total" and sample.labels["type"] in totals:
+                totals[sample.labels["type"]] += sample.value
+            elif sample.name == "resume_generator_llm_call_seconds_count":
+                totals["calls"] += sample.value
+    return totals
+
+
+def edited_job(step: int) -> str:
+    """The base job description with its last requirement swapped for a different skill."""
+    lines = job_description(0).splitlines()
+    lines[-1] = f"{step + 2}+ years with {SKILLS[step % len(SKILLS)]}."
+    return "\n".join(lines)
+
+
+def run_mode(app_url: str, mode: str, resume, edits: int, timeout: float) -> Dict[str, object]:
+    filename, content, content_type = resume
+    steps: List[Dict[str, float]] = []
+    for step in range(edits + 1):
+        before = llm_totals(httpx.get(f"{app_url}/metrics").text)
+        started = time.perf_counter()
+        response = httpx.post(
+            f"{app_url}/generate",
+            files={"resume": (filename, content, content_type)},
+            data={
+                "job_description": json.dumps({"text": edited_job(step)}),
+                "model_provider": "openai",
+                "mode": mode
+            },
+            timeout=timeout
+        )
+        response.raise_for_status()
+        elapsed = time.perf_counter() - started
+        after = llm_totals(httpx.get(f"{app_url}/metrics").text)
+        steps.append({"seconds": round(elapsed, 3), **{key: after[key] - before[key] for key in after}})
+        print(f"{mode} step {step}: {elapsed:.2f}s calls={steps[-1]['calls']:.0f} "
+              f"prompt={steps[-1]['prompt']:.0f} completion={steps[-1]['completion']:.0f}", flush=True)
+    # The first request fills the caches; the edits are what this benchmark is about
+    edit_steps = steps[1:]
+    return {
+        "steps": steps,
+        "edit_median_seconds": round(statistics.median(step["seconds"] for step in edit_steps), 3),
+        "edit_mean_calls": round(statistics.mean(step["calls"] for step in edit_steps), 2),
+        "edit_mean_prompt_tokens": round(statistics.mean(step["prompt"] for step in edit_steps)),
+        "edit_mean_completion_tokens": round(statistics.mean(step["completion"] for step in edit_steps))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edits", type=int, default=5)
+    parser.add_argument("--modes", default="split,sections")
+    parser.add_argument("--mock-latency", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--completion-tokens", type=int, default=150)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/incremental-<timestamp>-<commit>.json)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="resume-incremental-")
+    mock_port, app_port = free_port(), free_port()
+    mock_url, app_url = f"http://127.0.0.1:{mock_port}", f"http://127.0.0.1:{app_port}"
+    mock = start_mock_server(mock_port, args.mock_latency, args.tokens_per_second, args.completion_tokens)
+    # Near-duplicate reuse would answer the small edits without calling the LLM at all
+    app = start_app(app_port, {**app_environment(mock_url, workdir), "JOB_SIMILARITY": "false"})
+    modes = args.modes.split(",")
+    # A different resume per mode so one mode's cached documents do not serve another
+    resumes = build_resumes(len(modes))
+    results = {}
+    try:
+        wait_for(f"{mock_url}/stats", mock, args.timeout)
+        wait_for(f"{app_url}/health", app, args.timeout)
+        for mode, resume in zip(modes, resumes):
+            results[mode] = run_mode(app_url, mode, resume, args.edits, args.timeout)
+    finally:
+        for process in (app, mock):
+            process.terminate()
+            process.wait(timeout=10)
+
+    report = {"commit": current_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "modes": results}
+    output = args.output or os.path.join(
+        BENCHMARK_DIR, "results", f"incremental-{time.strftime('%Y%m%d-%H%M%S')}-{report['commit'] or 'unknown'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as result_file:
+        json.dump(report, result_file, indent=2)
+    for mode, result in results.items():
+        print(f"{mode}: median edit {result['edit_median_seconds']}s, {result['edit_mean_calls']} calls, "
+              f"{result['edit_mean_prompt_tokens']} prompt / {result['edit_mean_completion_tokens']} completion tokens")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
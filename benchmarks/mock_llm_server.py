@@ -0,0 +1,120 @@
+"""Local OpenAI-compatible chat completions server for offline benchmarks.
+
+Serves `/v1/chat/completions` (OpenAI) and `/chat/completions` (GitHub Models)
+with a fixed response latency and a configurable streaming speed, plus job
+posting pages at `/jobs/{index}` so URL fetches stay offline too.
+
+    python benchmarks/mock_llm_server.py --port 8100 --latency 0.5 --tokens-per-second 200
+"""
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fixtures import job_page_html
+
+WORDS = (
+    "experienced engineer delivered reliable scalable services improved latency reduced cost "
+    "collaborated with product teams shipped features mentored developers automated deployments"
+).split()
+
+
+def create_app(latency: float, jitter: float, tokens_per_second: float, completion_tokens: int) -> FastAPI:
+    app = FastAPI()
+    stats = {"requests": 0, "streams": 0}
+
+    def completion_text(rng: random.Random) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(completion_tokens))
+
+    def usage(messages: list) -> dict:
+        prompt_tokens = sum(len(message.get("content", "")) for message in messages) // 4
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": 0}
+        }
+
+    def chunk(model: str, completion_id: str, delta: dict, finish_reason=None) -> str:
+        return "data: " + json.dumps({
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }) + "\n\n"
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "mock")
+        messages = body.get("messages", [])
+        rng = random.Random()
+        stats["requests"] += 1
+        await asyncio.sleep(max(0.0, latency + rng.uniform(-jitter, jitter)))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        if body.get("stream"):
+            stats["streams"] += 1
+
+            async def events():
+                yield chunk(model, completion_id, {"role": "assistant", "content": ""})
+                for word in completion_text(rng).split():
+                    await asyncio.sleep(1 / tokens_per_second)
+                    yield chunk(model, completion_id, {"content": word + " "})
+                yield chunk(model, completion_id, {}, finish_reason="stop")
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    yield "data: " + json.dumps({
+                        "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                        "model": model, "choices": [], "usage": usage(messages)
+                    }) + "\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        # Non-streaming responses still take as long as generating the tokens would
+        await asyncio.sleep(completion_tokens / tokens_per_second)
+        text = completion_text(rng)
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            text = json.dumps({"updated_resume": text, "cover_letter": text})
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": usage(messages)
+        })
+
+    app.add_api_route("/v1/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/chat/completions", chat_completions, methods=["POST"])
+
+    @app.get("/jobs/{index}")
+    async def job_page(index: int):
+        return HTMLResponse(job_page_html(index), headers={"ETag": f'"job-{index}"'})
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds before the first token")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Random +/- seconds added to the latency")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--completion-tokens", type=int, default=300)
+    args = parser.parse_args()
+    app = create_app(args.latency, args.jitter, args.tokens_per_second, args.completion_tokens)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""Offline load test for the API against the local mock LLM server.
+
+Starts `mock_llm_server.py` and the app (`uvicorn main:app`) as subprocesses,
+then drives the app with the fixture corpus at increasing concurrency. For each
+level it records requests/sec, latency percentiles, event-loop lag (from the
+app's `/metrics`) and the RSS of the app and its extraction workers, and writes
+everything to a JSON file for comparison across commits.
+
+    python benchmarks/run_benchmark.py --concurrency 1,4,16 --requests 40
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List, Optional
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+from fixtures import build_resumes, job_description
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = os.path.join(ROOT, "benchmarks")
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 4)
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def process_rss(pid: int) -> Optional[int]:
+    """Resident memory of a process and its children, in bytes."""
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            return sum(p.memory_info().rss for p in [process] + process.children(recursive=True))
+        except psutil.Error:
+            return None
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+            with open(f"/proc/{current}/task/{current}/children") as children:
+                pending += [int(child) for child in children.read().split()]
+        except OSError:
+            if current == pid:
+                return None
+    return total
+
+
+def app_environment(mock_url: str, workdir: str) -> Dict[str, str]:
+    """Environment for an API process that talks only to the mock server."""
+    return {
+        **os.environ,
+        "OPENAI_API_KEY": "sk-benchmark",
+        "OPENAI_BASE_URL": f"{mock_url}/v1",
+        "GITHUB_TOKEN": "benchmark",
+        "GITHUB_MODELS_ENDPOINT": mock_url,
+        "OPENAI_REQUESTS_PER_MINUTE": "1000000",
+        "OPENAI_TOKENS_PER_MINUTE": "1000000000",
+        "GITHUB_REQUESTS_PER_MINUTE": "1000000",
+        "GITHUB_TOKENS_PER_MINUTE": "1000000000",
+        "CACHE_DIR": os.path.join(workdir, "cache"),
+        "JOB_QUEUE_PATH": os.path.join(workdir, "jobs.sqlite3"),
+        "JOB_FETCH_FRESH_SECONDS": "0"
+    }
+
+
+def start_mock_server(port: int, latency: float, tokens_per_second: float, completion_tokens: int) -> subprocess.Popen:
+    return subprocess.Popen([
+        sys.executable, os.path.join(BENCHMARK_DIR, "mock_llm_server.py"),
+        "--port", str(port),
+        "--latency", str(latency),
+        "--tokens-per-second", str(tokens_per_second),
+        "--completion-tokens", str(completion_tokens)
+    ], cwd=BENCHMARK_DIR)
+
+
+def start_app(port: int, env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"
+    ], cwd=os.path.join(ROOT, "src"), env=env)
+
+
+def event_loop_lag(metrics_text: str) -> Dict[str, float]:
+    """Cumulative event-loop lag histogram from the app's Prometheus output."""
+    lag = {"count": 0.0, "sum": 0.0, "buckets": {}}
+    for family in text_string_to_metric_families(metrics_text):
+        if family.name != "resume_generator_event_loop_lag_seconds":
+            continue
+        for sample in family.samples:
+            if sample.name.endswith("_count"):
+                lag["count"] = sample.value
+            elif sample.name.endswith("_sum"):
+                lag["sum"] = sample.value
+            elif sample.name.endswith("_bucket"):
+                lag["buckets"][sample.labels["le"]] = sample.value
+    return lag
+
+
+def lag_summary(before: Dict[str, float], after: Dict[str, float]) -> Dict[str, Optional[float]]:
+    """Mean lag and the histogram bucket holding the p99, over the interval between two scrapes."""
+    count = after["count"] - before["count"]
+    if count <= 0:
+        return {"samples": 0, "mean": None, "p99_upper_bound": None}
+    p99 = None
+    for bound, cumulative in sorted(after["buckets"].items(), key=lambda item: float(item[0])):
+        if cumulative - before["buckets"].get(bound, 0.0) >= 0.99 * count:
+            p99 = float(bound)
+            break
+    return {"samples": int(count), "mean": round((after["sum"] - before["sum"]) / count, 5), "p99_upper_bound": p99}
+
+
+class Benchmark:
+    def __init__(self, args):
+        self.args = args
+        self.resumes = build_resumes(args.resumes)
+        self.workdir = tempfile.mkdtemp(prefix="resume-bench-")
+        self.mock_port = free_port()
+        self.app_port = free_port()
+        self.processes: List[subprocess.Popen] = []
+        self.app_process: Optional[subprocess.Popen] = None
+
+    def start(self):
+        mock_url = f"http://127.0.0.1:{self.mock_port}"
+        self.processes.append(start_mock_server(
+            self.mock_port, self.args.mock_latency, self.args.tokens_per_second, self.args.completion_tokens
+        ))
+        self.app_process = start_app(self.app_port, app_environment(mock_url, self.workdir))
+        self.processes.append(self.app_process)
+
+    def stop(self):
+        for process in reversed(self.processes):
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    async def wait_until_ready(self, client: httpx.AsyncClient, timeout: float = 60.0):
+        deadline = time.monotonic() + timeout
+        for url in (f"http://127.0.0.1:{self.mock_port}/stats", f"{self.app_url}/health"):
+            while True:
+                if any(process.poll() is not None for process in self.processes):
+                    raise RuntimeError("A benchmark server exited during startup")
+                try:
+                    if (await client.get(url)).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Timed out waiting for {url}")
+                await asyncio.sleep(0.2)
+
+    @property
+    def app_url(self) -> str:
+        return f"http://127.0.0.1:{self.app_port}"
+
+    def request_form(self, number: int):
+        filename, content, content_type = self.resumes[number % len(self.resumes)]
+        if self.args.job_urls and number % 2:
+            job = {"text": "", "url": f"http://127.0.0.1:{self.mock_port}/jobs/{number % self.args.jobs}"}
+        else:
+            job = {"text": job_description(number % self.args.jobs)}
+        data = {
+            "job_description": json.dumps(job),
+            "model_provider": self.args.provider,
+            "use_cache": str(self.args.use_cache).lower()
+        }
+        if self.args.endpoint == "generate":
+            data["mode"] = self.args.mode
+        return {"resume": (filename, content, content_type)}, data
+
+    async def one_request(self, client: httpx.AsyncClient, number: int) -> Dict[str, object]:
+        files, data = self.request_form(number)
+        path = "/generate/stream" if self.args.endpoint == "stream" else "/generate"
+        started = time.perf_counter()
+        first_byte = None
+        try:
+            async with client.stream("POST", f"{self.app_url}{path}", files=files, data=data) as response:
+                async for _ in response.aiter_bytes():
+                    if first_byte is None:
+                        first_byte = time.perf_counter() - started
+                status = response.status_code
+        except httpx.HTTPError as e:
+            return {"ok": False, "error": str(e) or e.__class__.__name__, "latency": time.perf_counter() - started}
+        return {"ok": status == 200, "status": status, "latency": time.perf_counter() - started,
+                "first_byte": first_byte}
+
+    async def run_level(self, client: httpx.AsyncClient, concurrency: int) -> Dict[str, object]:
+        lag_before = event_loop_lag((await client.get(f"{self.app_url}/metrics")).text)
+        rss_samples = []
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def sample_rss():
+            while True:
+                rss = process_rss(self.app_process.pid)
+                if rss is not None:
+                    rss_samples.append(rss)
+                await asyncio.sleep(0.2)
+
+        async def limited(number: int):
+            async with semaphore:
+                return await self.one_request(client, number)
+
+        sampler = asyncio.ensure_future(sample_rss())
+        started = time.perf_counter()
+        results = await asyncio.gather(*(limited(number) for number in range(self.args.requests)))
+        elapsed = time.perf_counter() - started
+        sampler.cancel()
+        lag_after = event_loop_lag((await client.get(f"{self.app_url}/metrics")).text)
+
+        latencies = [result["latency"] for result in results if result["ok"]]
+        first_bytes = [result["first_byte"] for result in results if result["ok"] and result["first_byte"]]
+        errors = [result for result in results if not result["ok"]]
+        return {
+            "concurrency": concurrency,
+            "requests": len(results),
+            "errors": len(errors),
+            "error_samples": [error.get("error") or error.get("status") for error in errors[:5]],
+            "elapsed": round(elapsed, 3),
+            "requests_per_second": round(len(latencies) / elapsed, 3),
+            "latency": {
+                "p50": percentile(latencies, 0.50),
+                "p95": percentile(latencies, 0.95),
+                "p99": percentile(latencies, 0.99),
+                "max": round(max(latencies), 4) if latencies else None
+            },
+            "time_to_first_byte": {
+                "p50": percentile(first_bytes, 0.50),
+                "p95": percentile(first_bytes, 0.95)
+            },
+            "event_loop_lag": lag_summary(lag_before, lag_after),
+            "rss_mb": {
+                "peak": round(max(rss_samples) / 2 ** 20, 1) if rss_samples else None,
+                "end": round(rss_samples[-1] / 2 ** 20, 1) if rss_samples else None
+            }
+        }
+
+    async def run(self) -> Dict[str, object]:
+        limits = httpx.Limits(max_connections=max(self.args.concurrency) + 10)
+        async with httpx.AsyncClient(timeout=self.args.timeout, limits=limits) as client:
+            await self.wait_until_ready(client)
+            # Warm up worker processes, connection pools and caches before measuring
+            await asyncio.gather(*(self.one_request(client, number) for number in range(min(4, self.args.requests))))
+            levels = []
+            for concurrency in self.args.concurrency:
+                level = await self.run_level(client, concurrency)
+                levels.append(level)
+                print(
+                    f"concurrency={concurrency:<4} rps={level['requests_per_second']:<8} "
+                    f"p50={level['latency']['p50']} p95={level['latency']['p95']} p99={level['latency']['p99']} "
+                    f"errors={level['errors']} lag_mean={level['event_loop_lag']['mean']} "
+                    f"rss_peak_mb={level['rss_mb']['peak']}",
+                    flush=True
+                )
+        return {
+            "commit": current_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "config": {key: value for key, value in vars(self.args).items() if key != "output"},
+            "levels": levels
+        }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="1,4,16,32",
+                        type=lambda value: [int(level) for level in value.split(",")])
+    parser.add_argument("--requests", type=int, default=40, help="Requests sent at each concurrency level")
+    parser.add_argument("--endpoint", choices=["generate", "stream"], default="generate")
+    parser.add_argument("--mode", choices=["split", "combined", "sections"], default="split")
+    parser.add_argument("--provider", default="openai")
+    parser.add_argument("--use-cache", action="store_true", help="Allow result cache hits (off by default)")
+    parser.add_argument("--job-urls", action="store_true", help="Fetch half of the job descriptions from URLs")
+    parser.add_argument("--resumes", type=int, default=10, help="Resumes in the fixture corpus")
+    parser.add_argument("--jobs", type=int, default=10, help="Job descriptions in the fixture corpus")
+    parser.add_argument("--mock-latency", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--completion-tokens", type=int, default=300)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchmark = Benchmark(args)
+    benchmark.start()
+    try:
+        results = asyncio.run(benchmark.run())
+    finally:
+        benchmark.stop()
+
+    output = args.output or os.path.join(
+        BENCHMARK_DIR, "results", f"{time.strftime('%Y%m%d-%H%M%S')}-{results['commit'] or 'unknown'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as result_file:
+        json.dump(results, result_file, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Near-duplicate index benchmark: lookup latency with many stored postings.
+
+Fills a fresh `JobSimilarityIndex` with generated postings, then times lookups
+of lightly edited copies (which should match) and of unseen postings (which
+should not). Use `--max-lookup-ms` to fail (exit 1) when the p99 lookup,
+excluding the signature computation, exceeds a limit.
+
+    python benchmarks/similarity_lookup.py --postings 100000 --max-lookup-ms 1
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from services.similarity import JobSimilarityIndex, minhash_signature  # noqa: E402
+
+VOCABULARY = [f"term{i}" for i in range(20000)]
+
+
+def posting(rng: random.Random, lines: int) -> str:
+    return "\n".join(" ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(4, 16))) for _ in range(lines))
+
+
+def relisted(rng: random.Random, text: str) -> str:
+    """The same posting with two lines swapped and a tracking link appended."""
+    lines = text.splitlines()
+    first, second = rng.sample(range(len(lines)), 2)
+    lines[first], lines[second] = lines[second], lines[first]
+    return "\n".join(lines) + f"\nApply at https://jobs.example/123?utm_source=feed{rng.randint(0, 999)}"
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--postings", type=int, default=100000)
+    parser.add_argument("--lines", type=int, default=12, help="Lines per generated posting")
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--scopes", type=int, default=100, help="Distinct resume/provider scopes")
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--max-lookup-ms", type=float, help="Exit with status 1 if the p99 lookup exceeds this")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    path = os.path.join(tempfile.mkdtemp(prefix="resume-similarity-"), "index.sqlite3")
+    index = JobSimilarityIndex(path, threshold=args.threshold, max_entries=args.postings)
+    samples = []
+    started = time.perf_counter()
+    for number in range(args.postings):
+        scope = f"scope-{number % args.scopes}"
+        text = posting(rng, args.lines)
+        index.add(scope, minhash_signature(text), f"job-{number}", f"result-{number}")
+        if len(samples) < args.lookups:
+            samples.append((scope, text, f"job-{number}"))
+        if (number + 1) % 10000 == 0:
+            print(f"stored {number + 1} postings ({time.perf_counter() - started:.0f}s)", flush=True)
+
+    timings = {"near_duplicate": [], "unseen": []}
+    found = {"near_duplicate": 0, "unseen": 0}
+    for scope, text, job_digest in samples:
+        for kind, query in (("near_duplicate", relisted(rng, text)), ("unseen", posting(rng, args.lines))):
+            signature = minhash_signature(query)
+            lookup_started = time.perf_counter()
+            match = index.find(scope, signature)
+            timings[kind].append((time.perf_counter() - lookup_started) * 1000)
+            found[kind] += match is not None and (kind == "unseen" or match["job_digest"] == job_digest)
+
+    signature_ms = []
+    for scope, text, _ in samples[:200]:
+        signature_started = time.perf_counter()
+        minhash_signature(text)
+        signature_ms.append((time.perf_counter() - signature_started) * 1000)
+
+    print(f"{len(index)} postings, {index.rows} rows per band")
+    print(f"signature: median {statistics.median(signature_ms):.3f}ms")
+    for kind, values in timings.items():
+        print(f"{kind}: p50 {percentile(values, 0.5):.3f}ms p99 {percentile(values, 0.99):.3f}ms "
+              f"matched {found[kind]}/{len(values)}")
+    index.close()
+
+    p99 = max(percentile(values, 0.99) for values in timings.values())
+    if args.max_lookup_ms is not None and p99 > args.max_lookup_ms:
+        print(f"p99 lookup {p99:.3f}ms exceeds {args.max_lookup_ms}ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import streamlit as st
 import requests
 import json
+import hashlib
 from io import StringIO
 
 # Initialize session state
@@ -10,6 +11,10 @@ if 'generated_cover_letter' not in st.session_state:
     st.session_state.generated_cover_letter = None
 if 'show_results' not in st.session_state:
     st.session_state.show_results = False
+if 'resume_id' not in st.session_state:
+    st.session_state.resume_id = None
+if 'exports' not in st.session_state:
+    st.session_state.exports = {}
 
 st.set_page_config(page_title="Cover Letter Generator", layout="wide")
 
@@ -19,8 +24,8 @@ st.write("Upload your resume and provide a job description to generate tailored
 # Model selection
 model_provider = st.radio(
     "Select AI Model Provider",
-    ["OpenAI", "GitHub"],
-    help="Choose which AI model provider to use for generation"
+    ["OpenAI", "GitHub", "Auto"],
+    help="Choose which AI model provider to use for generation. Auto picks the fastest available provider."
 )
 
 # File upload
@@ -30,6 +35,102 @@ resume_file = st.file_uploader("Upload your resume (PDF or DOCX)", type=["pdf",
 job_description = st.text_area("Paste job description here", key="job_description_input")
 job_url = st.text_input("Or enter job posting URL (optional)", key="job_url_input")
 
+use_cache = st.checkbox("Reuse previously generated documents", value=True,
+                        help="Uncheck to force fresh generation for the same resume and job")
+stream_output = st.checkbox("Show text as it is generated", value=True)
+by_section = st.checkbox("Only rewrite resume sections affected by job description changes", value=False,
+                         help="Rewrites the summary, skills and each position separately and reuses sections "
+                              "whose relevant requirements have not changed. Text is shown when complete.")
+
+API_URL = "http://localhost:8000"
+
+def post_generate(path, resume_bytes, form, stream=False):
+    """POST a generation request, sending the cached resume id when the file is unchanged."""
+    form = dict(form)
+    # Skip the upload when the server has already parsed this exact file
+    if st.session_state.resume_id == hashlib.sha256(resume_bytes).hexdigest():
+        form["resume_id"] = st.session_state.resume_id
+        response = requests.post(f"{API_URL}{path}", data=form, stream=stream)
+        if response.status_code != 404:
+            return response
+        # The server no longer has the parsed resume, so upload it again
+        form.pop("resume_id")
+    return requests.post(
+        f"{API_URL}{path}",
+        files={"resume": (resume_file.name, resume_bytes)},
+        data=form,
+        stream=stream
+    )
+
+def iter_sse(response):
+    """Yield `(event, data)` pairs from a server-sent event response."""
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            yield event, json.loads(line[len("data:"):])
+
+def generation_error(response):
+    """Error message for a failed generation request, asking the user to wait when the server is busy."""
+    if response.status_code in (429, 503) and response.headers.get("Retry-After"):
+        return f"The server is busy, please try again in {response.headers['Retry-After']} seconds."
+    return f"Error generating documents: {response.text}"
+
+def stream_documents(resume_bytes, form):
+    """Render both documents as they stream in and return the final result."""
+    result = {"updated_resume": "", "cover_letter": "", "errors": {}}
+    live = st.empty()
+    with live.container():
+        live_col1, live_col2 = st.columns(2)
+        live_col1.subheader("Updated Resume")
+        live_col2.subheader("Cover Letter")
+        placeholders = {"updated_resume": live_col1.empty(), "cover_letter": live_col2.empty()}
+    response = post_generate("/generate/stream", resume_bytes, form, stream=True)
+    if response.status_code != 200:
+        live.empty()
+        st.error(generation_error(response))
+        return None
+    for event, data in iter_sse(response):
+        if event == "token":
+            result[data["document"]] += data["delta"]
+            placeholders[data["document"]].markdown(result[data["document"]])
+        elif event == "done":
+            result["errors"] = data["errors"]
+            result["resume_id"] = data.get("resume_id")
+            result["near_duplicate"] = data.get("near_duplicate")
+    live.empty()
+    return result
+
+def export_buttons(document, text, label):
+    """Offer DOCX and PDF downloads of a document, rendered by the API on request."""
+    for file_format in ("docx", "pdf"):
+        key = f"{document}_{file_format}"
+        exported = st.session_state.exports.get(key)
+        # The text area may have been edited since the last export
+        if exported is None or exported["text"] != text:
+            if st.button(f"📄 Export {label} as {file_format.upper()}", key=f"export_{key}"):
+                with st.spinner(f"Rendering {file_format.upper()}..."):
+                    response = requests.post(f"{API_URL}/exports", data={
+                        "text": text,
+                        "document": document,
+                        "format": file_format,
+                        "resume_id": st.session_state.resume_id or ""
+                    })
+                    if response.status_code != 200:
+                        st.error(f"Export failed: {response.text}")
+                        continue
+                    artifact = requests.get(f"{API_URL}{response.json()['url']}")
+                    st.session_state.exports[key] = {"text": text, "content": artifact.content}
+                    st.rerun()
+        else:
+            st.download_button(
+                f"📥 Download {label} ({file_format.upper()})",
+                exported["content"],
+                file_name=f"{document}.{file_format}",
+                key=f"download_{key}"
+            )
+
 # Create two columns for the buttons
 col1, col2 = st.columns(2)
 
@@ -42,32 +143,52 @@ with col1:
         else:
             with st.spinner("Generating documents..."):
                 try:
-                    # Prepare the request
-                    files = {"resume": resume_file}
-                    data = {
-                        "job_description": {
+                    resume_bytes = resume_file.getvalue()
+                    form = {
+                        "job_description": json.dumps({
                             "text": job_description,
                             "url": job_url if job_url else None
-                        },
-                        "model_provider": model_provider
+                        }),
+                        "model_provider": model_provider,
+                        "use_cache": str(use_cache).lower()
                     }
+                    if by_section:
+                        form["mode"] = "sections"
                     
                     # Make API request
-                    response = requests.post(
-                        "http://localhost:8000/generate",
-                        files=files,
-                        data={"job_description": json.dumps(data["job_description"]),
-                              "model_provider": model_provider}
-                    )
+                    result = None
+                    if stream_output and not by_section:
+                        result = stream_documents(resume_bytes, form)
+                    else:
+                        response = post_generate("/generate", resume_bytes, form)
+                        if response.status_code == 200:
+                            result = response.json()
+                        else:
+                            st.error(generation_error(response))
                     
-                    if response.status_code == 200:
-                        result = response.json()
+                    if result is not None:
+                        st.session_state.resume_id = result.get("resume_id")
                         # Store results in session state
-                        st.session_state.generated_resume = result["updated_resume"]
-                        st.session_state.generated_cover_letter = result["cover_letter"]
+                        st.session_state.generated_resume = result["updated_resume"] or ""
+                        st.session_state.generated_cover_letter = result["cover_letter"] or ""
                         st.session_state.show_results = True
-                    else:
-                        st.error(f"Error generating documents: {response.text}")
+                        for document, error in result.get("errors", {}).items():
+                            st.warning(f"Could not generate {document.replace('_', ' ')}: {error}")
+                        sections = result.get("sections")
+                        if sections:
+                            counts = {status: sum(section["status"] == status for section in sections)
+                                      for status in ("generated", "cached", "kept", "failed")}
+                            st.caption(
+                                f"Resume sections: {counts['generated']} rewritten, {counts['cached']} reused, "
+                                f"{counts['kept']} unchanged" + (f", {counts['failed']} failed" if counts["failed"] else "")
+                            )
+                        near_duplicate = result.get("near_duplicate")
+                        if near_duplicate and near_duplicate["reused"]:
+                            st.info(
+                                f"Reused the documents generated for a near-identical posting "
+                                f"({near_duplicate['similarity']:.0%} similar). Uncheck \"Reuse previously "
+                                f"generated documents\" to generate new ones."
+                            )
                 except Exception as e:
                     st.error(f"An error occurred: {str(e)}")
 
@@ -78,6 +199,7 @@ with col2:
             st.session_state.generated_resume = None
             st.session_state.generated_cover_letter = None
             st.session_state.show_results = False
+            st.session_state.exports = {}
             st.rerun()
 
 # Display results if they exist
@@ -99,6 +221,7 @@ if st.session_state.show_results:
             file_name="updated_resume.txt",
             key="download_resume"
         )
+        export_buttons("updated_resume", resume_text, "Resume")
     
     with col2:
         st.subheader("Cover Letter")
@@ -113,4 +236,5 @@ if st.session_state.show_results:
             st.session_state.generated_cover_letter,
             file_name="cover_letter.txt",
             key="download_cover_letter"
-        ) 
\ No newline at end of file
+        )
+        export_buttons("cover_letter", cover_letter_text, "Cover Letter") 
\ No newline at end of file
@@ -0,0 +1,257 @@
+"""Headless bulk generation: tailor many resumes to many job postings without the API.
+
+    python bulk.py manifest.csv --output results.jsonl --concurrency 8 --provider openai
+
+The manifest is a CSV file with a header row, or JSONL, with one item per row:
+a `resume` path (PDF or DOCX) and the posting as `job_text`, `job_file` (a text
+file) or `job_url`, plus an optional unique `id`. Relative paths are resolved
+against the manifest's directory.
+
+Each finished item is appended to the output as one JSON line with its
+documents, status and per-stage timings. Running the same command again after
+a crash or Ctrl-C skips the items already written successfully and retries the
+rest. Provider rate limits default to the API's (`<PROVIDER>_REQUESTS_PER_MINUTE`,
+`<PROVIDER>_TOKENS_PER_MINUTE`) and are shared with running servers through the
+state backend; `--requests-per-minute` and `--tokens-per-minute` override them.
+"""
+import os
+import csv
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+from typing import Any, Dict, List, Set
+from services.cache import create_cache, make_key
+from services.document_service import DocumentService
+from services.http_client import create_http_client
+from services.job_fetcher import JobPostingFetcher
+from services.metrics import start_request_spans
+from services.router import PROVIDER_CLASSES, ProviderRouter, load_provider_services
+from services.settings import get_settings
+from services.state import create_state_backend
+
+logger = logging.getLogger(__name__)
+
+MODES = ("split", "combined", "sections")
+
+
+def read_manifest(path: str) -> List[Dict[str, str]]:
+    """Load and validate the manifest's items, resolving paths against its directory."""
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, newline="", encoding="utf-8") as manifest:
+        if path.endswith(".jsonl"):
+            rows = [json.loads(line) for line in manifest if line.strip()]
+        else:
+            rows = list(csv.DictReader(manifest))
+
+    items = []
+    seen = set()
+    for number, row in enumerate(rows, start=1):
+        fields = {key: str(row.get(key) or "").strip() for key in ("id", "resume", "job_text", "job_file", "job_url")}
+        if not fields["resume"] or not (fields["job_text"] or fields["job_file"] or fields["job_url"]):
+            raise ValueError(f"{path} item {number}: needs a resume and a job_text, job_file or job_url")
+        resume = os.path.join(base, os.path.expanduser(fields["resume"]))
+        job_text = fields["job_text"]
+        if not job_text and fields["job_file"]:
+            with open(os.path.join(base, os.path.expanduser(fields["job_file"])), encoding="utf-8") as job_file:
+                job_text = job_file.read()
+        # Without an explicit id, the item's inputs name it, so reordering the manifest keeps checkpoints valid
+        item_id = fields["id"] or make_key(resume, job_text, fields["job_url"])[:16]
+        if item_id in seen:
+            raise ValueError(f"{path} item {number}: duplicate id {item_id}")
+        seen.add(item_id)
+        items.append({"id": item_id, "resume": resume, "job_text": job_text, "job_url": fields["job_url"]})
+    return items
+
+
+def completed_items(path: str) -> Set[str]:
+    """Ids already written to the output with status "ok"; a line torn by a crash is cut off."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb+") as output:
+        data = output.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            logger.warning(f"Discarding an incomplete last line in {path}")
+            output.truncate(end)
+    done = set()
+    for line in data[:end].splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        # The latest line for an item wins, so a retried failure counts once it succeeds
+        if record.get("status") == "ok":
+            done.add(record["id"])
+        else:
+            done.discard(record["id"])
+    return done
+
+
+class BulkRunner:
+    """Generate documents for manifest items with bounded concurrency, appending results as they finish."""
+
+    def __init__(self, doc_service: DocumentService, llm_service: ProviderRouter, output,
+                 mode: str = "split", use_cache: bool = True):
+        self.doc_service = doc_service
+        self.llm_service = llm_service
+        self.output = output
+        self.mode = mode
+        self.use_cache = use_cache
+        self.stats = {"ok": 0, "error": 0}
+
+    async def _generate(self, resume_text: str, job_text: str) -> dict:
+        if self.mode == "combined":
+            return await self.llm_service.generate_documents_combined(resume_text, job_text, use_cache=self.use_cache)
+        if self.mode == "sections":
+            return await self.llm_service.generate_documents_sections(resume_text, job_text, use_cache=self.use_cache)
+        return await self.llm_service.generate_documents(resume_text, job_text, use_cache=self.use_cache)
+
+    async def run_item(self, item: Dict[str, str]) -> Dict[str, Any]:
+        # Stages recorded by the services (resume_extraction, job_fetch, llm_<provider>, ...) land here
+        spans = start_request_spans()
+        started = time.perf_counter()
+        record: Dict[str, Any] = {"id": item["id"], "resume": item["resume"], "job_url": item["job_url"] or None}
+        try:
+            resume_id, resume_text = await self.doc_service.load_resume_file(item["resume"])
+            job_text = item["job_text"] or await self.doc_service.extract_job_description(item["job_url"])
+            resume_text, job_text, input_tokens = self.llm_service.compact_inputs(resume_text, job_text)
+            documents = await self._generate(resume_text, job_text)
+            complete = documents["updated_resume"] is not None and documents["cover_letter"] is not None
+            record.update({
+                "status": "ok" if complete else "error",
+                "resume_id": resume_id,
+                **documents,
+                "input_tokens": input_tokens
+            })
+        except Exception as e:
+            logger.error(f"Item {item['id']} failed: {str(e)}")
+            record.update({"status": "error", "error": str(e) or e.__class__.__name__})
+        record["elapsed"] = round(time.perf_counter() - started, 3)
+        timings: Dict[str, float] = {}
+        for stage, seconds in spans:
+            timings[stage] = timings.get(stage, 0.0) + seconds
+        record["timings"] = {stage: round(seconds, 3) for stage, seconds in timings.items()}
+        return record
+
+    def write(self, record: Dict[str, Any]):
+        self.output.write(json.dumps(record) + "\n")
+        self.output.flush()
+        # Each finished item is durable before the next one is reported, which is what makes resuming safe
+        os.fsync(self.output.fileno())
+        self.stats[record["status"]] += 1
+
+    async def run(self, items: List[Dict[str, str]], concurrency: int):
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in items:
+            queue.put_nowait(item)
+
+        async def worker():
+            while not queue.empty():
+                item = queue.get_nowait()
+                record = await self.run_item(item)
+                self.write(record)
+                finished = self.stats["ok"] + self.stats["error"]
+                logger.info(f"[{finished}/{len(items)}] {item['id']}: {record['status']} in {record['elapsed']}s")
+
+        await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(items))))))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("manifest", help="CSV or JSONL manifest of resume/job pairs")
+    parser.add_argument("--output", help="Results JSONL, also the checkpoint (default: <manifest>.results.jsonl)")
+    parser.add_argument("--provider", default="openai", choices=("openai", "github", "auto"))
+    parser.add_argument("--mode", default="split", choices=MODES)
+    parser.add_argument("--concurrency", type=int, default=4, help="Items generated at once")
+    parser.add_argument("--requests-per-minute", type=float, help="Override every provider's request rate limit")
+    parser.add_argument("--tokens-per-minute", type=float, help="Override every provider's token rate limit")
+    parser.add_argument("--no-cache", action="store_true", help="Regenerate documents even if they are cached")
+    parser.add_argument("--verbose", action="store_true", help="Log the services' progress as well")
+    args = parser.parse_args(argv)
+    for rate in ("requests_per_minute", "tokens_per_minute"):
+        if getattr(args, rate) is not None and getattr(args, rate) <= 0:
+            parser.error(f"--{rate.replace('_', '-')} must be positive")
+    return args
+
+
+async def run(args) -> int:
+    settings = get_settings()
+    for name in PROVIDER_CLASSES:
+        if args.requests_per_minute is not None:
+            settings.requests_per_minute[name] = args.requests_per_minute
+        if args.tokens_per_minute is not None:
+            settings.tokens_per_minute[name] = args.tokens_per_minute
+
+    items = read_manifest(args.manifest)
+    output_path = args.output or f"{os.path.splitext(args.manifest)[0]}.results.jsonl"
+    done = completed_items(output_path)
+    pending = [item for item in items if item["id"] not in done]
+    logger.info(f"{len(items)} items in {args.manifest}, {len(items) - len(pending)} already done, "
+                f"{len(pending)} to run")
+    if not pending:
+        return 0
+
+    http_client = create_http_client(settings)
+    state = create_state_backend(settings=settings)
+    resume_cache = create_cache("resume", state=state, settings=settings)
+    job_page_cache = create_cache("job_page", state=state, settings=settings)
+    result_cache = create_cache("result", state=state, settings=settings)
+    doc_service = DocumentService(
+        cache=resume_cache,
+        fetcher=JobPostingFetcher(http_client=http_client, cache=job_page_cache, settings=settings),
+        settings=settings
+    )
+    started = time.perf_counter()
+    try:
+        services = load_provider_services(
+            {}, http_client=http_client, cache=result_cache, settings=settings, state=state
+        )
+        llm_service = ProviderRouter(
+            services,
+            preferred=None if args.provider == "auto" else args.provider,
+            hedge=args.provider == "auto" and settings.llm_hedge,
+            fallback=settings.llm_fallback,
+            cache=result_cache,
+            settings=settings
+        )
+        with open(output_path, "a", encoding="utf-8") as output:
+            runner = BulkRunner(doc_service, llm_service, output, mode=args.mode, use_cache=not args.no_cache)
+            try:
+                await runner.run(pending, args.concurrency)
+            except asyncio.CancelledError:
+                logger.warning(f"Interrupted; run the same command again to resume from {output_path}")
+                raise
+    finally:
+        await http_client.aclose()
+        doc_service.close()
+        result_cache.close()
+        resume_cache.close()
+        job_page_cache.close()
+        state.close()
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Finished {len(pending)} items in {elapsed:.1f}s ({runner.stats['ok']} ok, "
+                f"{runner.stats['error']} failed, {len(pending) / elapsed * 60:.1f} items/minute); "
+                f"results in {output_path}")
+    return 1 if runner.stats["error"] else 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    # This module's progress lines are shown even when the services are quiet
+    logger.setLevel(logging.INFO)
+    try:
+        sys.exit(asyncio.run(run(args)))
+    except (OSError, ValueError) as e:
+        logger.error(str(e))
+        sys.exit(2)
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""Gunicorn settings for running the API with uvicorn workers (`gunicorn -c gunicorn.conf.py main:app`)."""
+import os
+import shutil
+from prometheus_client import multiprocess
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+worker_class = "uvicorn.workers.UvicornWorker"
+# Covers waiting for open requests plus draining jobs and LLM calls in the lifespan shutdown
+graceful_timeout = int(os.getenv("SHUTDOWN_GRACE_SECONDS", "30")) + int(float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "30")))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+
+metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR") or os.path.join(".data", "prometheus")
+
+
+def on_starting(server):
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,26 +1,89 @@
 import os
-from dotenv import load_dotenv
 import logging
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, Request, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
-import uvicorn
+from typing import List, Optional
 import json
-from services.llm_service import LLMService
-from services.github_llm_service import GitHubLLMService
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from services.admission import AdmissionMiddleware, create_admission_controller
+from services.base_llm_service import DOCUMENT_KINDS
+from services.router import ProviderRouter, load_provider_services
 from services.document_service import DocumentService
+from services.concurrency import cancel_on_disconnect, llm_calls
+from services.export import EXPORT_FORMATS, create_export_service
+from services.http_client import create_http_client
+from services.cache import create_cache, make_key
+from services.job_fetcher import JobPostingFetcher
+from services.job_queue import create_job_queue
+from services.metrics import (
+    RequestTimingMiddleware, create_profiler, monitor_event_loop_lag, render_metrics, span
+)
+from services.settings import get_settings
+from services.similarity import create_job_index
+from services.state import create_state_backend
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
-logger.info(f"Current working directory: {os.getcwd()}")
-logger.info(f"API Key loaded: {os.getenv('OPENAI_API_KEY')[:8]}...")  # Only log first 8 chars
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Settings load .env before anything below reads its configuration
+    settings = app.state.settings = get_settings()
+    logger.info(f"Current working directory: {os.getcwd()}")
+    app.state.profiler = create_profiler(settings)
+    app.state.admission = create_admission_controller(settings)
+    # One keep-alive connection pool and one client per provider for the whole process
+    app.state.http_client = create_http_client(settings)
+    app.state.llm_services = {}
+    app.state.routers = {}
+    # Rate limits and shared cache tiers live here so every worker process sees the same state
+    app.state.state_backend = create_state_backend(settings=settings)
+    app.state.resume_cache = create_cache("resume", state=app.state.state_backend, settings=settings)
+    app.state.job_page_cache = create_cache("job_page", state=app.state.state_backend, settings=settings)
+    app.state.exporter = create_export_service(settings)
+    app.state.doc_service = DocumentService(
+        cache=app.state.resume_cache,
+        fetcher=JobPostingFetcher(
+            http_client=app.state.http_client, cache=app.state.job_page_cache, settings=settings
+        ),
+        templates=app.state.exporter,
+        settings=settings
+    )
+    app.state.result_cache = create_cache("result", state=app.state.state_backend, settings=settings)
+    app.state.job_index = create_job_index(settings)
+    # Shared by every batch request so bursts of batches cannot flood the providers
+    app.state.batch_semaphore = asyncio.Semaphore(settings.batch_concurrency)
+    app.state.job_queue = create_job_queue(run_generation_job, settings)
+    if settings.preload_providers:
+        get_provider_services()
+    await app.state.job_queue.start()
+    lag_monitor = asyncio.ensure_future(monitor_event_loop_lag(settings.event_loop_lag_interval))
+    yield
+    lag_monitor.cancel()
+    # Let queued jobs and any other in-flight LLM calls finish before closing their connections
+    deadline = time.monotonic() + settings.shutdown_drain_timeout
+    await app.state.job_queue.stop(drain_timeout=settings.shutdown_drain_timeout)
+    if not await llm_calls.wait_idle(max(0.0, deadline - time.monotonic())):
+        logger.warning(f"Shutting down with {llm_calls.count} LLM calls still in flight")
+    await app.state.http_client.aclose()
+    app.state.result_cache.close()
+    app.state.resume_cache.close()
+    app.state.job_page_cache.close()
+    if app.state.job_index is not None:
+        app.state.job_index.close()
+    app.state.doc_service.close()
+    app.state.exporter.close()
+    app.state.state_backend.close()
+
+app = FastAPI(lifespan=lifespan)
 
-app = FastAPI()
+# Runs inside CORS so rejections still carry its headers
+app.add_middleware(AdmissionMiddleware)
 
 # Add CORS middleware
 app.add_middleware(
@@ -31,57 +94,478 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so admission rejections and CORS preflights are timed too
+app.add_middleware(RequestTimingMiddleware)
+
 class JobDescription(BaseModel):
     text: str
     url: Optional[str] = None
 
+def get_provider_services():
+    """Create the shared service for every provider that is configured."""
+    return load_provider_services(
+        app.state.llm_services,
+        http_client=app.state.http_client,
+        cache=app.state.result_cache,
+        settings=app.state.settings,
+        state=app.state.state_backend
+    )
+
+def get_llm_service(model_provider: str):
+    """Return the shared router for `model_provider` ("openai", "github" or "auto").
+
+    A named provider is tried first and falls back to the others when it fails;
+    "auto" picks the fastest healthy provider and may hedge slow requests.
+    """
+    choice = model_provider.lower()
+    if choice not in ("auto", "github"):
+        choice = "openai"  # default to OpenAI
+    routers = app.state.routers
+    if choice not in routers:
+        routers[choice] = ProviderRouter(
+            get_provider_services(),
+            preferred=None if choice == "auto" else choice,
+            hedge=choice == "auto" and app.state.settings.llm_hedge,
+            fallback=app.state.settings.llm_fallback,
+            cache=app.state.result_cache,
+            settings=app.state.settings,
+            admission=app.state.admission
+        )
+    return routers[choice]
+
+async def admit_generation(request: Request, llm_service: ProviderRouter):
+    """Wait for a slot on the provider the request will try first (429/503 when it is saturated).
+
+    Fallback and hedged calls to other providers take their own slots in the router.
+    """
+    await app.state.admission.admit(request, llm_service.ranked()[0].provider_name)
+
+async def resolve_resume(resume: Optional[UploadFile], resume_id: Optional[str]):
+    """Return `(resume_id, text)` from a cached resume id or an uploaded file."""
+    doc_service = app.state.doc_service
+    if resume_id:
+        text = await doc_service.get_resume(resume_id)
+        if text is not None:
+            logger.info(f"Using cached resume {resume_id[:12]}")
+            return resume_id, text
+        if resume is None:
+            raise HTTPException(status_code=404, detail="Unknown resume_id, please upload the resume again")
+    if resume is None:
+        raise HTTPException(status_code=400, detail="Either a resume file or resume_id is required")
+    logger.info(f"Received request with file: {resume.filename}")
+    return await doc_service.load_resume(resume)
+
+async def prepare_inputs(resume: Optional[UploadFile], resume_id: Optional[str], job_description: str):
+    """Return `(resume_id, resume_text, job_text)` for a generation request."""
+    # Parse the job description JSON string
+    job_desc_data = json.loads(job_description)
+    job_desc = JobDescription(**job_desc_data)
+    
+    # Process resume
+    logger.info("Processing resume...")
+    resume_id, resume_content = await resolve_resume(resume, resume_id)
+    logger.info(f"Resume processed, length: {len(resume_content)}")
+    
+    # Process job description
+    job_desc_text = job_desc.text
+    if job_desc.url:
+        logger.info(f"Extracting job description from URL: {job_desc.url}")
+        job_desc_text = await app.state.doc_service.extract_job_description(job_desc.url)
+    logger.info(f"Job description processed, length: {len(job_desc_text)}")
+    return resume_id, resume_content, job_desc_text
+
+def similarity_scope(model_provider: str, mode: str, resume_content: str) -> str:
+    """Near-duplicate postings only share documents for the same resume, provider choice and mode."""
+    return make_key("job_similarity", resume_content, model_provider.lower(), mode)
+
+async def find_previous_generation(scope: str, job_desc_text: str):
+    """Return `(signature, previous)` for documents generated from a near-identical posting.
+
+    `previous` holds the `similarity` and the earlier `documents`, or is None when
+    there is no match. Exact repeats are left to the result cache.
+    """
+    job_index = app.state.job_index
+    if job_index is None:
+        return None, None
+    with span("similarity_lookup"):
+        signature, match = await job_index.lookup(scope, job_desc_text)
+    if match is None or match["job_digest"] == make_key(job_desc_text):
+        return signature, None
+    documents = await app.state.result_cache.get(match["result_key"])
+    if documents is None:
+        return signature, None
+    return signature, {"similarity": round(match["similarity"], 3), "documents": documents}
+
+async def remember_generation(scope: str, signature, job_desc_text: str, documents: dict):
+    """Index a posting whose documents both generated, so near-duplicates can reuse them."""
+    if app.state.job_index is None or documents["updated_resume"] is None or documents["cover_letter"] is None:
+        return
+    job_digest = make_key(job_desc_text)
+    result_key = make_key("near_duplicate", scope, job_digest)
+    # Mode-specific keys (`mode`, `sections`) are kept so a replay matches a fresh response
+    await app.state.result_cache.set(result_key, {key: value for key, value in documents.items() if key != "errors"})
+    await app.state.job_index.remember(scope, signature, job_digest, result_key)
+
+async def generate_batch_item(index: int, job_desc: JobDescription, llm_service,
+                              resume_content: str, use_cache: bool) -> dict:
+    """Generate documents for one batch entry, reporting failures in the result."""
+    started = time.monotonic()
+    try:
+        job_desc_text = job_desc.text
+        if job_desc.url:
+            job_desc_text = await app.state.doc_service.extract_job_description(job_desc.url)
+        item_resume, job_desc_text, input_tokens = llm_service.compact_inputs(resume_content, job_desc_text)
+        async with app.state.batch_semaphore:
+            release = await app.state.admission.gate(llm_service.ranked()[0].provider_name).acquire()
+            try:
+                documents = await llm_service.generate_documents(item_resume, job_desc_text, use_cache=use_cache)
+            finally:
+                release()
+        status = "ok" if documents["updated_resume"] is not None or documents["cover_letter"] is not None else "error"
+        return {
+            "index": index,
+            "status": status,
+            **documents,
+            "input_tokens": input_tokens,
+            "elapsed": round(time.monotonic() - started, 3)
+        }
+    except Exception as e:
+        logger.error(f"Batch item {index} failed: {str(e)}")
+        return {
+            "index": index,
+            "status": "error",
+            "error": e.detail if isinstance(e, HTTPException) else str(e),
+            "elapsed": round(time.monotonic() - started, 3)
+        }
+
+async def run_generation_job(payload: dict) -> dict:
+    """Job queue handler: run the /generate pipeline for a queued job."""
+    llm_service = get_llm_service(payload["model_provider"])
+    job_desc_text = payload["job_text"]
+    if payload.get("job_url"):
+        job_desc_text = await app.state.doc_service.extract_job_description(payload["job_url"])
+    resume_content, job_desc_text, input_tokens = llm_service.compact_inputs(payload["resume_text"], job_desc_text)
+    documents = await llm_service.generate_documents(resume_content, job_desc_text, use_cache=payload["use_cache"])
+    if documents["updated_resume"] is None and documents["cover_letter"] is None:
+        # Raising lets the queue retry the job with backoff
+        raise RuntimeError(json.dumps(documents["errors"]))
+    return {"resume_id": payload["resume_id"], **documents, "input_tokens": input_tokens}
+
+def format_sse(event: dict) -> str:
+    """Encode an event dict as a server-sent event named after its `event` key."""
+    payload = {key: value for key, value in event.items() if key != "event"}
+    return f"event: {event['event']}\ndata: {json.dumps(payload)}\n\n"
+
+@app.post("/resumes")
+async def upload_resume(resume: UploadFile = File(...)):
+    """Parse a resume once and return the id to send with later requests."""
+    try:
+        resume_id, resume_content = await resolve_resume(resume, None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"resume_id": resume_id, "length": len(resume_content)}
+
 @app.post("/generate")
 async def generate_documents(
-    resume: UploadFile = File(...),
+    request: Request,
+    resume: Optional[UploadFile] = File(None),
+    resume_id: Optional[str] = Form(None),
     job_description: str = Form(...),
-    model_provider: str = Form(...)
+    model_provider: str = Form(...),
+    use_cache: bool = Form(True),
+    mode: str = Form("split")
 ):
     try:
-        # Log the incoming request
-        logger.info(f"Received request with file: {resume.filename}")
-        
-        # Parse the job description JSON string
-        job_desc_data = json.loads(job_description)
-        job_desc = JobDescription(**job_desc_data)
-        
-        # Initialize services
-        doc_service = DocumentService()
-        
-        # Select the appropriate LLM service
-        if model_provider.lower() == "github":
-            llm_service = GitHubLLMService()
-        else:  # default to OpenAI
-            llm_service = LLMService()
-        
-        # Process resume
-        logger.info("Processing resume...")
-        resume_content = await doc_service.process_resume(resume)
-        logger.info(f"Resume processed, length: {len(resume_content)}")
-        
-        # Process job description
-        job_desc_text = job_desc.text
-        if job_desc.url:
-            logger.info(f"Extracting job description from URL: {job_desc.url}")
-            job_desc_text = await doc_service.extract_job_description(job_desc.url)
-        logger.info(f"Job description processed, length: {len(job_desc_text)}")
+        if mode not in ("split", "combined", "sections"):
+            raise ValueError("mode must be 'split', 'combined' or 'sections'")
+        llm_service = get_llm_service(model_provider)
+        await admit_generation(request, llm_service)
+        resume_id, resume_content, job_desc_text = await prepare_inputs(resume, resume_id, job_description)
+        resume_content, job_desc_text, input_tokens = llm_service.compact_inputs(resume_content, job_desc_text)
+
+        # A re-listed posting with trivial edits can reuse the documents already generated for it
+        scope = similarity_scope(model_provider, mode, resume_content)
+        signature, previous = await find_previous_generation(scope, job_desc_text)
+        if previous is not None and use_cache:
+            logger.info(f"Reusing documents from a near-duplicate posting (similarity {previous['similarity']})")
+            with span("serialize"):
+                return JSONResponse({
+                    "resume_id": resume_id,
+                    **previous["documents"],
+                    "errors": {},
+                    "input_tokens": input_tokens,
+                    "near_duplicate": {"similarity": previous["similarity"], "reused": True}
+                })
         
         # Generate tailored documents
-        logger.info(f"Generating documents using {model_provider}...")
-        updated_resume = await llm_service.generate_tailored_resume(resume_content, job_desc_text)
-        cover_letter = await llm_service.generate_cover_letter(resume_content, job_desc_text)
+        logger.info(f"Generating documents using {model_provider} ({mode} mode)...")
+        if mode == "combined":
+            generation = llm_service.generate_documents_combined(resume_content, job_desc_text, use_cache=use_cache)
+        elif mode == "sections":
+            generation = llm_service.generate_documents_sections(resume_content, job_desc_text, use_cache=use_cache)
+        else:
+            generation = llm_service.generate_documents(resume_content, job_desc_text, use_cache=use_cache)
+        documents = await cancel_on_disconnect(request, generation)
+        if documents["updated_resume"] is None and documents["cover_letter"] is None:
+            raise HTTPException(status_code=502, detail=documents["errors"])
+        await remember_generation(scope, signature, job_desc_text, documents)
         
-        return {
-            "updated_resume": updated_resume,
-            "cover_letter": cover_letter
-        }
+        with span("serialize"):
+            response = {"resume_id": resume_id, **documents, "input_tokens": input_tokens}
+            if previous is not None:
+                # Offered rather than used because the caller asked for fresh documents
+                response["near_duplicate"] = {"similarity": previous["similarity"], "reused": False}
+            return JSONResponse(response)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.warning(f"Rejected request: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/generate/stream")
+async def generate_documents_stream(
+    request: Request,
+    resume: Optional[UploadFile] = File(None),
+    resume_id: Optional[str] = Form(None),
+    job_description: str = Form(...),
+    model_provider: str = Form(...),
+    use_cache: bool = Form(True)
+):
+    """Stream both documents token by token as server-sent events."""
+    try:
+        llm_service = get_llm_service(model_provider)
+        await admit_generation(request, llm_service)
+        resume_id, resume_content, job_desc_text = await prepare_inputs(resume, resume_id, job_description)
+        resume_content, job_desc_text, input_tokens = llm_service.compact_inputs(resume_content, job_desc_text)
+        # Streams produce the same documents as split mode, so the two share near-duplicates
+        scope = similarity_scope(model_provider, "split", resume_content)
+        signature, previous = await find_previous_generation(scope, job_desc_text)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.warning(f"Rejected request: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error processing request: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def reused_events():
+        logger.info(f"Reusing documents from a near-duplicate posting (similarity {previous['similarity']})")
+        for kind in DOCUMENT_KINDS:
+            yield format_sse({"event": "token", "document": kind, "delta": previous["documents"][kind]})
+        yield format_sse({
+            "event": "done",
+            "documents": {kind: {"length": len(previous["documents"][kind]), "time_to_first_token": 0.0}
+                          for kind in DOCUMENT_KINDS},
+            "errors": {},
+            "elapsed": 0.0,
+            "resume_id": resume_id,
+            "input_tokens": input_tokens,
+            "near_duplicate": {"similarity": previous["similarity"], "reused": True}
+        })
+
+    async def events():
+        logger.info(f"Streaming documents using {model_provider}...")
+        documents = {"updated_resume": "", "cover_letter": ""}
+        async for event in llm_service.stream_documents(resume_content, job_desc_text, use_cache=use_cache):
+            if event["event"] == "token":
+                documents[event["document"]] += event["delta"]
+            elif event["event"] == "done":
+                for kind in event["errors"]:
+                    documents[kind] = None
+                await remember_generation(scope, signature, job_desc_text, documents)
+                event["resume_id"] = resume_id
+                event["input_tokens"] = input_tokens
+                if previous is not None:
+                    event["near_duplicate"] = {"similarity": previous["similarity"], "reused": False}
+            yield format_sse(event)
+
+    if previous is not None and use_cache:
+        return StreamingResponse(
+            reused_events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    # Streaming responses are cancelled by Starlette when the client disconnects
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/generate/batch")
+async def generate_documents_batch(
+    request: Request,
+    resume: Optional[UploadFile] = File(None),
+    resume_id: Optional[str] = Form(None),
+    jobs: str = Form(...),
+    model_provider: str = Form(...),
+    use_cache: bool = Form(True)
+):
+    """Tailor one resume to many job descriptions, streaming NDJSON results as they finish."""
+    try:
+        job_descs: List[JobDescription] = [JobDescription(**job) for job in json.loads(jobs)]
+        max_jobs = app.state.settings.batch_max_jobs
+        if not job_descs or len(job_descs) > max_jobs:
+            raise ValueError(f"A batch must contain between 1 and {max_jobs} jobs")
+        llm_service = get_llm_service(model_provider)
+        # Each item takes its own provider slot; the batch only waits for capacity before its upload is read
+        await app.state.admission.check(llm_service.ranked()[0].provider_name)
+        resume_id, resume_content = await resolve_resume(resume, resume_id)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.warning(f"Rejected request: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error processing request: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def results():
+        logger.info(f"Generating {len(job_descs)} batch items using {model_provider}...")
+        started = time.monotonic()
+        tasks = [
+            asyncio.ensure_future(generate_batch_item(index, job_desc, llm_service, resume_content, use_cache))
+            for index, job_desc in enumerate(job_descs)
+        ]
+        failed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                failed += item["status"] == "error"
+                yield json.dumps(item) + "\n"
+            yield json.dumps({
+                "done": True,
+                "resume_id": resume_id,
+                "total": len(tasks),
+                "failed": failed,
+                "elapsed": round(time.monotonic() - started, 3)
+            }) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+@app.post("/jobs", status_code=202)
+async def create_job(
+    resume: Optional[UploadFile] = File(None),
+    resume_id: Optional[str] = Form(None),
+    job_description: str = Form(...),
+    model_provider: str = Form(...),
+    use_cache: bool = Form(True),
+    priority: int = Form(0)
+):
+    """Queue a generation job and return its id for polling via GET /jobs/{job_id}."""
+    try:
+        job_desc = JobDescription(**json.loads(job_description))
+        # Rejects an unconfigured provider now rather than after every retry in the worker
+        get_llm_service(model_provider)
+        resume_id, resume_content = await resolve_resume(resume, resume_id)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.warning(f"Rejected request: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # The resume text is stored with the job so it survives cache eviction and restarts
+    job_id = await app.state.job_queue.enqueue({
+        "resume_id": resume_id,
+        "resume_text": resume_content,
+        "job_text": job_desc.text,
+        "job_url": job_desc.url,
+        "model_provider": model_provider,
+        "use_cache": use_cache
+    }, priority=priority)
+    logger.info(f"Queued job {job_id} with priority {priority}")
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/jobs/stats")
+async def job_stats():
+    """Number of queued jobs in each status."""
+    return await app.state.job_queue.get_stats()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await app.state.job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/exports")
+async def create_export(
+    text: str = Form(...),
+    document: str = Form(...),
+    export_format: str = Form(..., alias="format"),
+    resume_id: Optional[str] = Form(None)
+):
+    """Render a generated document to DOCX or PDF and return the URL of the stored file.
+
+    DOCX exports of an uploaded DOCX resume (`resume_id`) reuse that file's styles.
+    """
+    try:
+        artifact = await app.state.exporter.export(document, export_format, text, resume_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Export failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    return {**artifact, "url": f"/exports/{artifact['name']}"}
+
+@app.get("/exports/{name}")
+async def get_export(name: str, request: Request):
+    """Serve a stored export. Names are content hashes, so the file never changes."""
+    path = app.state.exporter.artifact_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+    document, _, rest = name.partition("-")
+    digest, _, file_format = rest.partition(".")
+    headers = {"ETag": f'"{digest}"', "Cache-Control": "public, max-age=31536000, immutable"}
+    if request.headers.get("if-none-match") in (f'"{digest}"', f'W/"{digest}"'):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=EXPORT_FORMATS[file_format], filename=f"{document}.{file_format}",
+                        headers=headers)
+
+@app.get("/providers/stats")
+async def provider_stats():
+    return {
+        "providers": {
+            name: {
+                **service.guard.get_stats(),
+                "latency": service.latency.get_stats(),
+                "usage": service.usage.as_dict()
+            }
+            for name, service in app.state.llm_services.items()
+        },
+        "routers": {name: router.get_stats() for name, router in app.state.routers.items()},
+        "admission": app.state.admission.get_stats()
+    }
+
+@app.get("/health")
+async def health():
+    """Liveness check that touches no providers, for load balancers and cold-start timing."""
+    return {"status": "ok", "pid": os.getpid(), "providers": sorted(app.state.llm_services)}
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: request and per-stage latency histograms, LLM call latency and tokens."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return {
+        "result": app.state.result_cache.get_stats(),
+        "resume": app.state.resume_cache.get_stats(),
+        "job_page": app.state.job_page_cache.get_stats(),
+        "job_similarity": app.state.job_index.get_stats() if app.state.job_index is not None else None,
+        "exports": app.state.exporter.get_stats()
+    }
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
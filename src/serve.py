@@ -0,0 +1,45 @@
+"""Production entry point: serve the API from several worker processes.
+
+    python serve.py
+
+Workers share caches, rate limits and the job queue through the state backend
+(`STATE_BACKEND`, SQLite by default). On SIGTERM/SIGINT each worker stops
+accepting connections, waits up to `SHUTDOWN_GRACE_SECONDS` for open requests,
+then drains queued jobs and in-flight LLM calls for up to `SHUTDOWN_DRAIN_TIMEOUT`.
+"""
+import os
+import shutil
+import logging
+import uvicorn
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def prepare_metrics_dir(workers: int):
+    """Point prometheus_client at a fresh directory so /metrics aggregates every worker."""
+    if workers < 2 or os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return
+    directory = os.path.join(".data", "prometheus")
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+    # Must be set before the workers import prometheus_client
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+
+
+def main():
+    workers = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+    prepare_metrics_dir(workers)
+    logger.info(f"Starting {workers} workers")
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=workers,
+        timeout_graceful_shutdown=int(os.getenv("SHUTDOWN_GRACE_SECONDS", "30")),
+        log_level=os.getenv("LOG_LEVEL", "info")
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import json
+import math
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import HTTPException
+from prometheus_client import Counter, Gauge
+from services.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "resume_generator_admission_queue_depth", "Generation requests waiting for a provider slot",
+    ["provider"], multiprocess_mode="livesum"
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "resume_generator_admission_in_flight", "Generation requests holding a provider slot",
+    ["provider"], multiprocess_mode="livesum"
+)
+ADMISSION_REJECTIONS = Counter(
+    "resume_generator_admission_rejections_total", "Requests turned away by admission control",
+    ["provider", "reason"]
+)
+
+# Scope key holding the callbacks that release a request's slots when its response ends
+RELEASES_KEY = "admission_releases"
+MAX_RETRY_AFTER = 60
+
+
+class Overloaded(HTTPException):
+    """Admission was refused; the response carries a Retry-After header."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(status_code=status_code, detail=detail, headers={"Retry-After": str(retry_after)})
+        self.retry_after = retry_after
+
+
+class ProviderGate:
+    """At most `limit` requests in flight for one provider, with a bounded queue of waiters.
+
+    Waiters are served in arrival order. A request that would exceed `max_queue`
+    is refused at once with 429; one still waiting after `queue_timeout` seconds
+    gets 503. Both carry a Retry-After estimated from recent slot hold times.
+    """
+
+    def __init__(self, provider: str, limit: int, max_queue: int, queue_timeout: float):
+        self.provider = provider
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiters: List[asyncio.Future] = []
+        # Smoothed seconds a request holds a slot, for Retry-After estimates
+        self.hold_seconds: Optional[float] = None
+        self.stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0}
+
+    def retry_after(self) -> int:
+        hold = self.hold_seconds if self.hold_seconds is not None else 1.0
+        return min(MAX_RETRY_AFTER, max(1, math.ceil(hold * (len(self.waiters) + 1) / self.limit)))
+
+    def _reject(self, status_code: int, reason: str, detail: str) -> Overloaded:
+        self.stats[f"rejected_{reason}"] += 1
+        ADMISSION_REJECTIONS.labels(self.provider, reason).inc()
+        logger.warning(f"Rejected {self.provider} request: {detail}")
+        return Overloaded(status_code, detail, self.retry_after())
+
+    async def acquire(self) -> Callable[[], None]:
+        """Wait for a slot and return the callback that releases it."""
+        if self.in_flight >= self.limit or self.waiters:
+            if len(self.waiters) >= self.max_queue:
+                raise self._reject(429, "queue_full", f"{self.provider} is at capacity, try again later")
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            self.stats["queued"] += 1
+            ADMISSION_QUEUE_DEPTH.labels(self.provider).inc()
+            try:
+                await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release_slot()
+                raise self._reject(
+                    503, "timeout", f"No {self.provider} capacity within {self.queue_timeout:g}s, try again later"
+                )
+            except asyncio.CancelledError:
+                # A slot handed over just as the request was cancelled goes to the next waiter
+                if waiter.done() and not waiter.cancelled():
+                    self._release_slot()
+                raise
+            finally:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+                ADMISSION_QUEUE_DEPTH.labels(self.provider).dec()
+        else:
+            self.in_flight += 1
+            ADMISSION_IN_FLIGHT.labels(self.provider).inc()
+        self.stats["admitted"] += 1
+        started = time.monotonic()
+        released = False
+
+        def release():
+            nonlocal released
+            if released:
+                return
+            released = True
+            held = time.monotonic() - started
+            self.hold_seconds = held if self.hold_seconds is None else 0.8 * self.hold_seconds + 0.2 * held
+            self._release_slot()
+
+        return release
+
+    def _release_slot(self):
+        # The slot passes straight to the oldest waiter, so in_flight only drops when nobody is waiting
+        while self.waiters:
+            waiter = self.waiters.pop(0)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.labels(self.provider).dec()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "in_flight": self.in_flight,
+            "queue_depth": len(self.waiters),
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "hold_seconds": round(self.hold_seconds, 3) if self.hold_seconds is not None else None
+        }
+
+
+class AdmissionController:
+    """Admission control for this worker process: provider gates plus a cap on open generation requests.
+
+    `max_pending` bounds the generation requests a worker holds at once, from
+    the moment their upload starts arriving until their response ends, so a
+    burst is turned away before its bodies are read. `max_body_bytes` bounds
+    every request body.
+    """
+
+    def __init__(self, limit: int = 8, max_queue: int = 16, queue_timeout: float = 10.0,
+                 max_pending: int = 64, max_body_bytes: int = 11 * 1024 * 1024):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_pending = max_pending
+        self.max_body_bytes = max_body_bytes
+        self.pending = 0
+        self.gates: Dict[str, ProviderGate] = {}
+        self.stats = {"rejected_pending": 0, "rejected_too_large": 0}
+
+    def gate(self, provider: str) -> ProviderGate:
+        if provider not in self.gates:
+            self.gates[provider] = ProviderGate(provider, self.limit, self.max_queue, self.queue_timeout)
+        return self.gates[provider]
+
+    async def admit(self, request, provider: str):
+        """Hold a slot on `provider` until the request's response (including any stream) has ended."""
+        release = await self.gate(provider).acquire()
+        releases = request.scope.get(RELEASES_KEY)
+        if releases is None:
+            # Outside the middleware (e.g. a direct call) nothing would release the slot later
+            release()
+            return
+        releases.append(release)
+
+    async def check(self, provider: str):
+        """Wait until `provider` has a free slot without keeping it, for requests whose parts are admitted one by one."""
+        await self.gate(provider).acquire()
+        # Handed straight back, so the hold time estimate only reflects real work
+        self.gate(provider)._release_slot()
+
+    def retry_after(self) -> int:
+        return max([gate.retry_after() for gate in self.gates.values()] or [1])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "max_body_bytes": self.max_body_bytes,
+            "providers": {name: gate.get_stats() for name, gate in self.gates.items()}
+        }
+
+
+class AdmissionMiddleware:
+    """Enforce body size limits while a request streams in and cap open generation requests.
+
+    Oversized bodies are refused from their Content-Length before anything is
+    read, or with 413 as soon as a chunked body passes the limit. Requests under
+    `limited_prefix` beyond the controller's `max_pending` get 429 immediately.
+    """
+
+    def __init__(self, app, limited_prefix: str = "/generate"):
+        self.app = app
+        self.limited_prefix = limited_prefix
+
+    async def __call__(self, scope, receive, send):
+        app = scope.get("app")
+        controller: Optional[AdmissionController] = getattr(app.state, "admission", None) if app is not None else None
+        if scope["type"] != "http" or controller is None:
+            await self.app(scope, receive, send)
+            return
+
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > controller.max_body_bytes:
+            controller.stats["rejected_too_large"] += 1
+            ADMISSION_REJECTIONS.labels("all", "too_large").inc()
+            await self._reject(send, 413, f"Request body exceeds {controller.max_body_bytes} bytes")
+            return
+
+        limited = scope["method"] == "POST" and scope["path"].startswith(self.limited_prefix)
+        if limited and controller.pending >= controller.max_pending:
+            controller.stats["rejected_pending"] += 1
+            ADMISSION_REJECTIONS.labels("all", "pending").inc()
+            logger.warning(f"Rejected {scope['path']}: {controller.pending} generation requests already open")
+            await self._reject(send, 429, "Server is at capacity, try again later", controller.retry_after())
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > controller.max_body_bytes:
+                    controller.stats["rejected_too_large"] += 1
+                    ADMISSION_REJECTIONS.labels("all", "too_large").inc()
+                    # Raised inside body parsing, so FastAPI turns it into the 413 response
+                    raise HTTPException(
+                        status_code=413, detail=f"Request body exceeds {controller.max_body_bytes} bytes"
+                    )
+            return message
+
+        scope[RELEASES_KEY] = []
+        if limited:
+            controller.pending += 1
+        try:
+            await self.app(scope, limited_receive, send)
+        finally:
+            if limited:
+                controller.pending -= 1
+            for release in scope[RELEASES_KEY]:
+                release()
+
+    @staticmethod
+    async def _reject(send, status_code: int, detail: str, retry_after: Optional[int] = None):
+        headers = [(b"content-type", b"application/json")]
+        if retry_after is not None:
+            headers.append((b"retry-after", str(retry_after).encode("ascii")))
+        # The client may still be sending the body; the server closes the connection after this response
+        headers.append((b"connection", b"close"))
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": json.dumps({"detail": detail}).encode("utf-8")})
+
+
+def create_admission_controller(settings: Optional[Settings] = None) -> AdmissionController:
+    """Build the admission controller from the `ADMISSION_*` and `MAX_UPLOAD_BYTES` settings."""
+    settings = settings or get_settings()
+    controller = AdmissionController(
+        limit=settings.admission_max_in_flight,
+        max_queue=settings.admission_max_queue,
+        queue_timeout=settings.admission_queue_timeout,
+        max_pending=settings.admission_max_pending,
+        max_body_bytes=settings.max_upload_bytes
+    )
+    logger.info(f"Admission control: {controller.limit} in flight and {controller.max_queue} queued per provider, "
+                f"{controller.max_pending} open generation requests")
+    return controller
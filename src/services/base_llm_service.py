@@ -0,0 +1,435 @@
+import time
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from services.cache import TieredCache, make_key
+from services.compaction import InputCompactor
+from services.concurrency import gather_settled, llm_calls
+from services.metrics import record_llm_call, record_llm_tokens, span
+from services.prompts import get_template, parse_combined_output
+from services.resilience import LatencyTracker, create_provider_guard
+from services.sections import extract_requirements, relevant_requirements, split_resume_sections
+from services.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_KINDS = ("updated_resume", "cover_letter")
+# Rough completion size reserved against the tokens-per-minute budget
+COMPLETION_TOKEN_ESTIMATE = 1024
+
+
+def estimate_tokens(messages: list) -> int:
+    """Approximate the tokens a request will consume (about 4 characters per token)."""
+    return sum(len(message["content"]) for message in messages) // 4 + COMPLETION_TOKEN_ESTIMATE
+
+
+class UsageStats:
+    """Token usage reported by a provider, including prompt tokens served from its prompt cache."""
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def record(self, provider: str, usage: Optional[dict]):
+        if not usage:
+            return
+        details = usage.get("prompt_tokens_details") or {}
+        cached = details.get("cached_tokens") or 0
+        self.requests += 1
+        self.prompt_tokens += usage.get("prompt_tokens") or 0
+        self.cached_prompt_tokens += cached
+        self.completion_tokens += usage.get("completion_tokens") or 0
+        record_llm_tokens(provider, usage.get("prompt_tokens") or 0, cached, usage.get("completion_tokens") or 0)
+        logger.info(
+            f"{provider} usage: prompt={usage.get('prompt_tokens')} cached={cached} "
+            f"completion={usage.get('completion_tokens')}"
+        )
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_prompt_ratio": self.cached_prompt_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+        }
+
+
+class SectionTailoringError(RuntimeError):
+    """Every resume section that needed rewriting failed; `sections` holds the per-section report."""
+
+    def __init__(self, message: str, sections: List[Dict[str, object]]):
+        super().__init__(message)
+        self.sections = sections
+
+
+class DocumentGenerator(ABC):
+    """Document generation and result caching on top of chat completions.
+
+    Completions are answered through `_answer`/`_answer_stream`, which also
+    return the provider that answered. Results are cached under that provider's
+    key and looked up under the key of the provider `_first_choice` would ask,
+    so an answer is never served as another provider's.
+    """
+
+    def __init__(self, cache: Optional[TieredCache] = None, settings: Optional[Settings] = None):
+        self.settings = settings or get_settings()
+        # Covers all attempts of one document, including retries and backoff
+        self.document_timeout = self.settings.llm_document_timeout
+        self.cache = cache
+
+    @abstractmethod
+    async def _answer(self, messages: list,
+                      response_format: Optional[dict] = None) -> Tuple["BaseLLMService", str]:
+        """Run a chat completion, returning the provider that answered and its text."""
+
+    @abstractmethod
+    def _answer_stream(self, messages: list) -> AsyncIterator[Tuple["BaseLLMService", str]]:
+        """Stream a chat completion as `(provider, delta)` pairs."""
+
+    @abstractmethod
+    def _first_choice(self) -> "BaseLLMService":
+        """The provider a call would go to first, whose cached results are served."""
+
+    @abstractmethod
+    def compact_inputs(self, resume_content: str, job_description: str):
+        """Trim inputs to the provider's token budget, returning `(resume, job, token_stats)`."""
+
+    def build_messages(self, kind: str, resume_content: str, job_description: str) -> list:
+        return get_template(kind).render(resume_content, job_description)
+
+    async def complete(self, messages: list, response_format: Optional[dict] = None) -> str:
+        return (await self._answer(messages, response_format=response_format))[1]
+
+    async def stream(self, messages: list) -> AsyncIterator[str]:
+        async for _, delta in self._answer_stream(messages):
+            yield delta
+
+    async def generate_tailored_resume(self, resume_content: str, job_description: str) -> str:
+        return await self.complete(self.build_messages("updated_resume", resume_content, job_description))
+
+    async def generate_cover_letter(self, resume_content: str, job_description: str) -> str:
+        return await self.complete(self.build_messages("cover_letter", resume_content, job_description))
+
+    def cache_key(self, kind: str, resume_content: str, job_description: str, template: Optional[str] = None,
+                  provider: Optional["BaseLLMService"] = None) -> str:
+        provider = provider or self._first_choice()
+        return make_key(kind, resume_content, job_description,
+                        f"{provider.provider_name}/{provider.model}", get_template(template or kind).version)
+
+    async def generate_document(self, kind: str, resume_content: str, job_description: str,
+                                use_cache: bool = True) -> str:
+        """Generate a single document by kind, consulting the result cache first."""
+        if self.cache is not None and use_cache:
+            cached = await self.cache.get(self.cache_key(kind, resume_content, job_description))
+            if cached is not None:
+                logger.info(f"Result cache hit for {kind} ({self._first_choice().provider_name})")
+                return cached
+        provider, document = await self._answer(self.build_messages(kind, resume_content, job_description))
+        if self.cache is not None and use_cache:
+            await self.cache.set(self.cache_key(kind, resume_content, job_description, provider=provider), document)
+        return document
+
+    async def generate_documents(self, resume_content: str, job_description: str,
+                                 use_cache: bool = True) -> Dict[str, object]:
+        """Generate the resume and cover letter concurrently.
+
+        Each document is subject to `document_timeout`; a failed document is reported
+        under `errors` without discarding the other one. Only successful
+        documents are cached.
+        """
+        results, errors = await gather_settled(
+            {
+                kind: self.generate_document(kind, resume_content, job_description, use_cache)
+                for kind in DOCUMENT_KINDS
+            },
+            timeout=self.document_timeout
+        )
+        return {
+            "updated_resume": results.get("updated_resume"),
+            "cover_letter": results.get("cover_letter"),
+            "errors": errors
+        }
+
+    async def generate_documents_combined(self, resume_content: str, job_description: str,
+                                          use_cache: bool = True) -> Dict[str, object]:
+        """Generate both documents with a single request that sends the inputs once.
+
+        Falls back to `generate_documents` (two calls) when the response cannot
+        be parsed into both documents. The result's `mode` records which path was used.
+        """
+        if self.cache is not None and use_cache:
+            cached = {
+                kind: await self.cache.get(self.cache_key(kind, resume_content, job_description, template="combined"))
+                for kind in DOCUMENT_KINDS
+            }
+            if all(value is not None for value in cached.values()):
+                logger.info(f"Result cache hit for combined documents ({self._first_choice().provider_name})")
+                return {**cached, "errors": {}, "mode": "combined"}
+
+        messages = self.build_messages("combined", resume_content, job_description)
+        try:
+            provider, output = await asyncio.wait_for(
+                self._answer(messages, response_format={"type": "json_object"}),
+                timeout=self.document_timeout
+            )
+        except asyncio.TimeoutError:
+            error = f"combined generation timed out after {self.document_timeout}s"
+            return {"updated_resume": None, "cover_letter": None,
+                    "errors": {kind: error for kind in DOCUMENT_KINDS}, "mode": "combined"}
+        except Exception as e:
+            logger.error(f"Combined generation failed: {e}")
+            error = str(e) or e.__class__.__name__
+            return {"updated_resume": None, "cover_letter": None,
+                    "errors": {kind: error for kind in DOCUMENT_KINDS}, "mode": "combined"}
+
+        documents = parse_combined_output(output)
+        if documents is None:
+            logger.warning(f"Could not parse combined output from {provider.provider_name}, falling back to two calls")
+            return {**await self.generate_documents(resume_content, job_description, use_cache), "mode": "split_fallback"}
+
+        if self.cache is not None and use_cache:
+            for kind in DOCUMENT_KINDS:
+                key = self.cache_key(kind, resume_content, job_description, template="combined", provider=provider)
+                await self.cache.set(key, documents[kind])
+        return {**documents, "errors": {}, "mode": "combined"}
+
+    async def generate_resume_sections(self, resume_content: str, job_description: str,
+                                       use_cache: bool = True) -> Optional[Dict[str, object]]:
+        """Tailor the resume section by section, rewriting only sections whose requirements changed.
+
+        Summary, skills and each experience entry are rewritten in parallel, and
+        each result is cached under the section's text and the job requirements
+        relevant to it. Editing the job description or switching to a similar
+        role therefore only regenerates the sections those edits touch; the rest
+        come from the cache, and sections no requirement relates to are kept as
+        written. Returns the stitched `updated_resume` with a per-section report,
+        or None when the resume has no recognisable sections.
+        """
+        sections = split_resume_sections(resume_content)
+        if not any(section.tailorable for section in sections):
+            return None
+        requirements = extract_requirements(job_description)
+        texts: Dict[int, str] = {}
+        report = []
+        pending = {}
+        for index, section in enumerate(sections):
+            relevant = relevant_requirements(section, requirements)
+            entry = {"name": section.name, "requirements": len(relevant)}
+            report.append(entry)
+            if not relevant:
+                texts[index] = section.text
+                entry["status"] = "kept"
+                continue
+            requirement_text = "\n".join(f"- {requirement}" for requirement in relevant)
+            key = self.cache_key("resume_section", section.text, requirement_text)
+            cached = await self.cache.get(key) if self.cache is not None and use_cache else None
+            if cached is not None:
+                texts[index] = cached
+                entry["status"] = "cached"
+            else:
+                pending[str(index)] = self._generate_section(section.text, requirement_text, use_cache)
+                entry["status"] = "generated"
+
+        results, errors = await gather_settled(pending, timeout=self.document_timeout)
+        for name, text in results.items():
+            texts[int(name)] = text
+        for name, error in errors.items():
+            # A failed section keeps its original text rather than failing the whole resume
+            texts[int(name)] = sections[int(name)].text
+            report[int(name)].update(status="failed", error=error)
+        if pending and len(errors) == len(pending):
+            raise SectionTailoringError(f"No resume section could be tailored: {next(iter(errors.values()))}", report)
+        logger.info(
+            f"Resume sections: {len(pending) - len(errors)} generated, "
+            f"{sum(entry['status'] == 'cached' for entry in report)} cached, "
+            f"{sum(entry['status'] == 'kept' for entry in report)} kept"
+        )
+        return {"updated_resume": "\n\n".join(texts[index] for index in range(len(sections))), "sections": report}
+
+    async def _generate_section(self, section_text: str, requirement_text: str, use_cache: bool) -> str:
+        provider, text = await self._answer(self.build_messages("resume_section", section_text, requirement_text))
+        text = text.strip()
+        if self.cache is not None and use_cache:
+            key = self.cache_key("resume_section", section_text, requirement_text, provider=provider)
+            await self.cache.set(key, text)
+        return text
+
+    async def generate_documents_sections(self, resume_content: str, job_description: str,
+                                          use_cache: bool = True) -> Dict[str, object]:
+        """Generate the cover letter and a section-by-section resume (see `generate_resume_sections`).
+
+        Resumes without recognisable sections, and resumes whose sections all
+        failed to generate, are rewritten whole. The result's `sections` list is
+        then empty or reports every section's failure, respectively.
+        """
+        async def tailored_resume():
+            try:
+                tailored = await self.generate_resume_sections(resume_content, job_description, use_cache)
+            except SectionTailoringError as e:
+                logger.warning(f"{e}, rewriting the whole resume")
+                document = await self.generate_document("updated_resume", resume_content, job_description, use_cache)
+                return {"updated_resume": document, "sections": e.sections}
+            if tailored is None:
+                logger.info("No resume sections recognised, rewriting the whole resume")
+                document = await self.generate_document("updated_resume", resume_content, job_description, use_cache)
+                return {"updated_resume": document, "sections": []}
+            return tailored
+
+        results, errors = await gather_settled(
+            {
+                "updated_resume": tailored_resume(),
+                "cover_letter": self.generate_document("cover_letter", resume_content, job_description, use_cache)
+            },
+            timeout=self.document_timeout
+        )
+        resume = results.get("updated_resume") or {}
+        return {
+            "updated_resume": resume.get("updated_resume"),
+            "cover_letter": results.get("cover_letter"),
+            "errors": errors,
+            "mode": "sections",
+            "sections": resume.get("sections", [])
+        }
+
+    async def stream_document(self, kind: str, resume_content: str, job_description: str,
+                              use_cache: bool = True) -> AsyncIterator[str]:
+        """Yield a document as text deltas, storing the completed text in the cache."""
+        if self.cache is not None and use_cache:
+            cached = await self.cache.get(self.cache_key(kind, resume_content, job_description))
+            if cached is not None:
+                logger.info(f"Result cache hit for {kind} ({self._first_choice().provider_name})")
+                yield cached
+                return
+
+        pieces = []
+        provider = None
+        async for provider, delta in self._answer_stream(self.build_messages(kind, resume_content, job_description)):
+            pieces.append(delta)
+            yield delta
+        if self.cache is not None and use_cache and provider is not None:
+            key = self.cache_key(kind, resume_content, job_description, provider=provider)
+            await self.cache.set(key, "".join(pieces))
+
+    async def stream_documents(self, resume_content: str, job_description: str,
+                               use_cache: bool = True) -> AsyncIterator[Dict[str, object]]:
+        """Stream both documents concurrently as `token`/`error` events, then a `done` summary.
+
+        Events from the two documents are interleaved in arrival order. As with
+        `generate_documents`, a failure in one document does not stop the other.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        started = time.monotonic()
+        summary = {kind: {"length": 0, "time_to_first_token": None} for kind in DOCUMENT_KINDS}
+        errors: Dict[str, str] = {}
+
+        async def pump(kind: str):
+            try:
+                async def forward():
+                    async for delta in self.stream_document(kind, resume_content, job_description, use_cache):
+                        if summary[kind]["time_to_first_token"] is None:
+                            summary[kind]["time_to_first_token"] = round(time.monotonic() - started, 3)
+                        summary[kind]["length"] += len(delta)
+                        await queue.put({"event": "token", "document": kind, "delta": delta})
+                await asyncio.wait_for(forward(), timeout=self.document_timeout)
+            except asyncio.TimeoutError:
+                errors[kind] = f"{kind} timed out after {self.document_timeout}s"
+            except Exception as e:
+                logger.error(f"{kind} stream failed: {e}")
+                errors[kind] = str(e) or e.__class__.__name__
+            finally:
+                if kind in errors:
+                    await queue.put({"event": "error", "document": kind, "error": errors[kind]})
+                await queue.put(None)
+
+        tasks = [asyncio.ensure_future(pump(kind)) for kind in DOCUMENT_KINDS]
+        try:
+            finished = 0
+            while finished < len(tasks):
+                event = await queue.get()
+                if event is None:
+                    finished += 1
+                    continue
+                yield event
+            yield {
+                "event": "done",
+                "documents": summary,
+                "errors": errors,
+                "elapsed": round(time.monotonic() - started, 3)
+            }
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class BaseLLMService(DocumentGenerator):
+    """Shared generation logic for the LLM providers."""
+
+    provider_name = "base"
+
+    def __init__(self, model: Optional[str] = None, cache: Optional[TieredCache] = None, state=None,
+                 settings: Optional[Settings] = None):
+        super().__init__(cache=cache, settings=settings)
+        self.call_timeout = self.settings.llm_call_timeout
+        self.model = model
+        self._compactor = InputCompactor(self.provider_name, model, settings=self.settings)
+        self.guard = create_provider_guard(self.provider_name, state=state, settings=self.settings)
+        self.usage = UsageStats()
+        self.latency = LatencyTracker()
+
+    @abstractmethod
+    async def _complete(self, messages: list, response_format: Optional[dict] = None) -> str:
+        """Send one chat completion request to the provider and return its text."""
+
+    @abstractmethod
+    def _stream(self, messages: list) -> AsyncIterator[str]:
+        """Send one streaming chat completion request, yielding text deltas."""
+
+    def compact_inputs(self, resume_content: str, job_description: str):
+        """Trim inputs to this provider's token budget, returning `(resume, job, token_stats)`."""
+        with span("input_compaction"):
+            return self._compactor.compact(resume_content, job_description)
+
+    async def complete(self, messages: list, response_format: Optional[dict] = None) -> str:
+        """Run a chat completion under the provider's rate limits, retries and circuit breaker."""
+        started = time.monotonic()
+        try:
+            with llm_calls.track():
+                result = await self.guard.call(
+                    lambda: self._complete(messages, response_format=response_format),
+                    estimate_tokens(messages) + (COMPLETION_TOKEN_ESTIMATE if response_format is not None else 0)
+                )
+        except Exception:
+            self.latency.record_failure()
+            record_llm_call(self.provider_name, time.monotonic() - started, ok=False)
+            raise
+        self.latency.record_success(time.monotonic() - started)
+        record_llm_call(self.provider_name, time.monotonic() - started, ok=True)
+        return result
+
+    async def stream(self, messages: list) -> AsyncIterator[str]:
+        """Stream a chat completion under the provider's rate limits and circuit breaker."""
+        started = time.monotonic()
+        try:
+            with llm_calls.track():
+                async for delta in self.guard.stream(lambda: self._stream(messages), estimate_tokens(messages)):
+                    yield delta
+        except Exception:
+            self.latency.record_failure()
+            record_llm_call(self.provider_name, time.monotonic() - started, ok=False)
+            raise
+        self.latency.record_success(time.monotonic() - started)
+        record_llm_call(self.provider_name, time.monotonic() - started, ok=True)
+
+    async def _answer(self, messages: list, response_format: Optional[dict] = None) -> Tuple["BaseLLMService", str]:
+        return self, await self.complete(messages, response_format=response_format)
+
+    async def _answer_stream(self, messages: list) -> AsyncIterator[Tuple["BaseLLMService", str]]:
+        async for delta in self.stream(messages):
+            yield self, delta
+
+    def _first_choice(self) -> "BaseLLMService":
+        return self
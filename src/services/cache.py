@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from services.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(*parts: str) -> str:
+    """Build a content-addressed key from the SHA-256 of each part."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(hashlib.sha256(part.encode("utf-8")).digest())
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """In-memory LRU cache with an optional TTL."""
+
+    def __init__(self, max_entries: int = 256, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk cache with TTL expiry and entry-count/byte-size eviction."""
+
+    def __init__(self, path: str, ttl: Optional[float] = None,
+                 max_entries: int = 10000, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(value)
+
+    def set(self, key: str, value: Any):
+        payload = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl,))
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        # Drop least recently used entries until both limits are satisfied
+        while count > self.max_entries or total > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (row[0],))
+            count -= 1
+            total -= row[1]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """Memory LRU in front of an optional SQLite tier, with hit/miss counters."""
+
+    def __init__(self, name: str, memory: LRUCache, disk: Optional[SQLiteCache] = None):
+        self.name = name
+        self.memory = memory
+        self.disk = disk
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0}
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats["memory_hits"] += 1
+            return value
+        if self.disk is not None:
+            loop = asyncio.get_running_loop()
+            value = await loop.run_in_executor(None, self.disk.get, key)
+            if value is not None:
+                self.stats["disk_hits"] += 1
+                self.memory.set(key, value)
+                return value
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any):
+        self.stats["sets"] += 1
+        self.memory.set(key, value)
+        if self.disk is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.disk.set, key, value)
+
+    async def delete(self, key: str):
+        self.memory.delete(key)
+        if self.disk is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.disk.delete, key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hits = lookups - self.stats["misses"]
+        return {
+            **self.stats,
+            "memory_entries": len(self.memory),
+            "hit_rate": hits / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+
+def create_cache(name: str, state=None, settings: Optional[Settings] = None) -> TieredCache:
+    """Build a tiered cache configured from the `<NAME>_CACHE_*` settings.
+
+    With a `state` backend (see `services.state`) the shared tier comes from the
+    backend, e.g. Redis; otherwise it is a SQLite file under `CACHE_DIR`.
+    """
+    settings = settings or get_settings()
+    options = settings.cache_options(name)
+    ttl = options["ttl"]
+    memory = LRUCache(max_entries=options["max_entries"], ttl=ttl)
+    disk = None
+    if options["disk"]:
+        max_entries = options["max_disk_entries"]
+        max_bytes = options["max_bytes"]
+        if state is not None:
+            disk = state.create_cache_tier(name, ttl, max_entries, max_bytes)
+        else:
+            path = os.path.join(settings.cache_dir, f"{name}.sqlite3")
+            disk = SQLiteCache(path, ttl=ttl, max_entries=max_entries, max_bytes=max_bytes)
+    logger.info(f"Created {name} cache (disk: {disk.path if disk else 'disabled'})")
+    return TieredCache(name, memory, disk)
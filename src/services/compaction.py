@@ -0,0 +1,96 @@
+import logging
+import importlib.util
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from services.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+# tiktoken is optional and slow to import, so it is only loaded when the first tokens are counted
+HAS_TIKTOKEN = importlib.util.find_spec("tiktoken") is not None
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: Optional[str]):
+    import tiktoken
+    if model:
+        try:
+            return tiktoken.encoding_for_model(model.split("/")[-1])
+        except KeyError:
+            pass
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count tokens with tiktoken when installed, otherwise estimate about 4 characters per token."""
+    if not HAS_TIKTOKEN:
+        return (len(text) + 3) // 4
+    return len(_encoding(model).encode(text, disallowed_special=()))
+
+
+def dedupe_lines(lines: Iterable[str]) -> List[str]:
+    """Remove blank lines and repeats of a line seen earlier (ignoring case and spacing)."""
+    seen = set()
+    result = []
+    for line in lines:
+        normalized = " ".join(line.lower().split())
+        if not normalized or normalized in seen:
+            continue
+        seen.add(normalized)
+        result.append(line.strip())
+    return result
+
+
+def trim_to_budget(lines: List[str], budget: int, model: Optional[str] = None) -> List[str]:
+    """Keep whole lines from the top until the token budget is spent."""
+    kept = []
+    used = 0
+    for line in lines:
+        tokens = count_tokens(line, model) + 1
+        if used + tokens > budget:
+            logger.info(f"Trimmed input to {used} tokens (budget {budget})")
+            break
+        kept.append(line)
+        used += tokens
+    return kept
+
+
+class InputCompactor:
+    """Shrink resume and job description text to a per-provider token budget before prompting.
+
+    `budgets` (resume, job) replaces the provider's configured budgets, e.g. for
+    inputs that may be sent to several providers.
+    """
+
+    def __init__(self, provider: str, model: Optional[str] = None, settings: Optional[Settings] = None,
+                 budgets: Optional[Tuple[int, int]] = None):
+        self.model = model
+        self.resume_budget, self.job_budget = budgets or (settings or get_settings()).token_budgets(provider)
+
+    def compact_job_description(self, text: str) -> str:
+        # Site chrome is already gone from fetched pages (see `job_fetcher.strip_boilerplate`),
+        # and pasted descriptions are the user's own text, so only repeats are dropped
+        lines = dedupe_lines(text.splitlines())
+        return "\n".join(trim_to_budget(lines, self.job_budget, self.model))
+
+    def compact_resume(self, text: str) -> str:
+        # Resumes are kept verbatim apart from blank lines and the budget
+        lines = [line.rstrip() for line in text.splitlines() if line.strip()]
+        return "\n".join(trim_to_budget(lines, self.resume_budget, self.model))
+
+    def compact(self, resume_content: str, job_description: str) -> Tuple[str, str, Dict[str, Dict[str, int]]]:
+        """Return the compacted resume and job description with before/after token counts."""
+        compact_resume = self.compact_resume(resume_content)
+        compact_job = self.compact_job_description(job_description)
+        stats = {
+            "resume": {
+                "before": count_tokens(resume_content, self.model),
+                "after": count_tokens(compact_resume, self.model)
+            },
+            "job_description": {
+                "before": count_tokens(job_description, self.model),
+                "after": count_tokens(compact_job, self.model)
+            }
+        }
+        logger.info(f"Input tokens: {stats}")
+        return compact_resume, compact_job, stats
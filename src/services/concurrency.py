@@ -0,0 +1,174 @@
+import os
+import time
+import signal
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Set, Tuple
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+
+async def gather_settled(
+    coros: Dict[str, Awaitable[Any]],
+    timeout: Optional[float] = None
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Run named coroutines concurrently and collect results and errors separately.
+
+    A failure or timeout in one coroutine does not cancel the others.
+    """
+    async def _run(name: str, coro: Awaitable[Any]):
+        try:
+            return await asyncio.wait_for(coro, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"{name} timed out after {timeout}s")
+
+    names = list(coros)
+    outcomes = await asyncio.gather(
+        *(_run(name, coros[name]) for name in names),
+        return_exceptions=True
+    )
+
+    results: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, asyncio.CancelledError):
+            raise outcome
+        if isinstance(outcome, BaseException):
+            logger.error(f"{name} failed: {outcome}")
+            errors[name] = str(outcome) or outcome.__class__.__name__
+        else:
+            results[name] = outcome
+    return results, errors
+
+
+class ClientDisconnected(HTTPException):
+    """The client went away before the response was ready; answered with nginx's 499 status."""
+
+    def __init__(self):
+        super().__init__(status_code=499, detail="Client closed request")
+
+
+async def cancel_on_disconnect(request, coro: Awaitable[Any], poll_interval: float = 0.5) -> Any:
+    """Await `coro`, cancelling it if the HTTP client disconnects first.
+
+    Raises `ClientDisconnected` after cancelling, which endpoints pass through
+    like any other HTTPException, so the request ends without an error trace.
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.info("Client disconnected, cancelling generation")
+                task.cancel()
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+class InFlightTracker:
+    """Count operations in progress so shutdown can wait for them to finish."""
+
+    def __init__(self):
+        self.count = 0
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        self.count += 1
+        try:
+            yield
+        finally:
+            self.count -= 1
+
+    async def wait_idle(self, timeout: float, poll_interval: float = 0.1) -> bool:
+        """Wait up to `timeout` seconds for every tracked operation to finish; True if they did."""
+        deadline = time.monotonic() + timeout
+        while self.count > 0:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(poll_interval)
+        return True
+
+
+def _report_worker(connection):
+    try:
+        connection.send(os.getpid())
+    except OSError:
+        # The pool was closed while this worker was starting; it exits along with it
+        pass
+
+
+class SpawnPool:
+    """A process pool that is rebuilt when it breaks and killed when a call hangs.
+
+    Workers are spawned rather than forked, so they don't inherit the server's
+    threads and open connections. A call that finds the pool broken (another
+    call's timeout recycled it) is retried once on a fresh pool; a call that
+    times out kills the workers, since a stuck one would hold its slot forever.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Workers report their pids through this pipe on start, so a reset can kill them
+        self._pids, self._reporter = multiprocessing.Pipe(duplex=False)
+        self._workers: Set[int] = set()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_report_worker,
+                initargs=(self._reporter,)
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args, timeout: float) -> Any:
+        """Run `func(*args)` in a worker; raises `asyncio.TimeoutError` after `timeout` seconds."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self._get_executor()
+            try:
+                return await asyncio.wait_for(loop.run_in_executor(executor, func, *args), timeout=timeout)
+            except asyncio.TimeoutError:
+                if self._executor is executor:
+                    self.reset()
+                raise
+            except BrokenProcessPool:
+                if self._executor is executor:
+                    self.reset()
+                if attempt:
+                    raise
+
+    def reset(self):
+        """Kill the worker processes; the next call starts a fresh pool."""
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        while self._pids.poll():
+            self._workers.add(self._pids.recv())
+        for pid in self._workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        self._workers.clear()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# LLM calls in progress in this process, drained on shutdown
+llm_calls = InFlightTracker()
@@ -1,51 +1,181 @@
-import PyPDF2
-import docx
-from bs4 import BeautifulSoup
-import requests
-from io import BytesIO
+import os
+import asyncio
+import hashlib
+import logging
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Iterator, Optional, Tuple
+from services.cache import TieredCache
+from services.concurrency import SpawnPool
+from services.job_fetcher import JobPostingFetcher
+from services.metrics import span
+from services.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def iter_pdf_pages(stream, max_pages: int) -> Iterator[str]:
+    """Yield the text of each PDF page, stopping after `max_pages` pages."""
+    # Parsers are imported in the extraction workers only, keeping them out of server startup
+    import PyPDF2
+    pdf_reader = PyPDF2.PdfReader(stream)
+    for index, page in enumerate(pdf_reader.pages):
+        if index >= max_pages:
+            logger.info(f"Stopping PDF extraction after {max_pages} pages")
+            break
+        yield page.extract_text() or ""
+
+def collect_text(pieces: Iterable[str], max_chars: int, separator: str = "") -> str:
+    """Join text pieces once, stopping early as soon as `max_chars` is reached."""
+    collected = []
+    total = 0
+    for piece in pieces:
+        collected.append(piece)
+        total += len(piece) + len(separator)
+        if total >= max_chars:
+            break
+    return separator.join(collected)[:max_chars]
+
+def extract_pdf_text(path: str, max_pages: int, max_chars: int) -> str:
+    """Extract text from a PDF file page by page. Runs in a worker process."""
+    with open(path, "rb") as pdf_file:
+        return collect_text(iter_pdf_pages(pdf_file, max_pages), max_chars)
+
+def extract_docx_text(path: str, max_chars: int) -> str:
+    """Extract paragraph text from a DOCX file. Runs in a worker process."""
+    import docx
+    doc = docx.Document(path)
+    return collect_text((paragraph.text for paragraph in doc.paragraphs), max_chars, separator="\n")
 
 class DocumentService:
+    def __init__(self, cache: Optional[TieredCache] = None,
+                 fetcher: Optional[JobPostingFetcher] = None, templates=None, settings: Optional[Settings] = None):
+        settings = settings or get_settings()
+        self.cache = cache
+        self.fetcher = fetcher or JobPostingFetcher(settings=settings)
+        # Keeps uploaded DOCX files for exports (see `ExportService.save_template`)
+        self.templates = templates
+        self.max_workers = settings.extraction_workers
+        self.extraction_timeout = settings.extraction_timeout
+        self.max_pages = settings.max_resume_pages
+        self.max_chars = settings.max_resume_chars
+        self.max_bytes = settings.max_resume_bytes
+        self._pool = SpawnPool(self.max_workers)
+
+    async def _run_extraction(self, func, *args) -> str:
+        try:
+            return await self._pool.run(func, *args, timeout=self.extraction_timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Resume extraction timed out after {self.extraction_timeout}s")
+            raise ValueError("Resume could not be parsed in time")
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            logger.error(f"Resume extraction failed: {str(e)}")
+            raise ValueError(f"Could not read resume: {str(e)}")
+
+    def close(self):
+        """Shut down the extraction worker pool."""
+        self._pool.close()
+
+    def _extractor_for(self, filename: str):
+        if filename.endswith('.pdf'):
+            return extract_pdf_text, (self.max_pages, self.max_chars)
+        if filename.endswith('.docx'):
+            return extract_docx_text, (self.max_chars,)
+        raise ValueError("Unsupported file format")
+
     async def process_resume(self, file) -> str:
         """Extract text from uploaded resume file."""
-        content = await file.read()
-        
-        if file.filename.endswith('.pdf'):
-            return self._extract_from_pdf(content)
-        elif file.filename.endswith('.docx'):
-            return self._extract_from_docx(content)
-        else:
-            raise ValueError("Unsupported file format")
-    
-    def _extract_from_pdf(self, content: bytes) -> str:
-        pdf_file = BytesIO(content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
+        _, text = await self.load_resume(file)
         return text
-    
-    def _extract_from_docx(self, content: bytes) -> str:
-        docx_file = BytesIO(content)
-        doc = docx.Document(docx_file)
-        return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+
+    async def load_resume(self, file) -> Tuple[str, str]:
+        """Extract text from an uploaded resume, returning `(resume_id, text)`.
+
+        The resume id is the SHA-256 of the uploaded bytes, so repeat uploads of
+        the same file are served from the parse cache.
+        """
+        extractor, args = self._extractor_for(file.filename)
+
+        # Hash straight from the upload's spooled temp file rather than a full in-memory copy
+        digest = hashlib.sha256()
+        size = 0
+        with span("upload_read"):
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise ValueError(f"Resume exceeds the {self.max_bytes // (1024 * 1024)} MB size limit")
+                digest.update(chunk)
+        resume_id = digest.hexdigest()
+
+        suffix = os.path.splitext(file.filename)[1]
+        keep_template = (
+            suffix == ".docx" and self.templates is not None and not self.templates.has_template(resume_id)
+        )
+        text = await self.get_resume(resume_id)
+        if text is not None:
+            logger.info(f"Parse cache hit for resume {resume_id[:12]}")
+            if not keep_template:
+                return resume_id, text
+
+        # Worker processes cannot see the spooled upload, so copy it to a named temp file
+        await file.seek(0)
+        with span("upload_spool"), tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_file:
+            path = temp_file.name
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                temp_file.write(chunk)
+        try:
+            if keep_template:
+                self.templates.save_template(resume_id, path)
+            if text is not None:
+                return resume_id, text
+            with span("resume_extraction"):
+                text = await self._run_extraction(extractor, path, *args)
+        finally:
+            os.unlink(path)
+
+        if self.cache is not None:
+            await self.cache.set(resume_id, text)
+        return resume_id, text
+
+    async def load_resume_file(self, path: str) -> Tuple[str, str]:
+        """Extract text from a resume on local disk, returning `(resume_id, text)` like `load_resume`."""
+        extractor, args = self._extractor_for(path)
+        if os.path.getsize(path) > self.max_bytes:
+            raise ValueError(f"Resume exceeds the {self.max_bytes // (1024 * 1024)} MB size limit")
+        digest = hashlib.sha256()
+        with span("upload_read"), open(path, "rb") as resume_file:
+            for chunk in iter(lambda: resume_file.read(UPLOAD_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        resume_id = digest.hexdigest()
+
+        text = await self.get_resume(resume_id)
+        if text is not None:
+            logger.info(f"Parse cache hit for resume {resume_id[:12]}")
+        else:
+            # The workers read the file where it is, so there is nothing to spool
+            with span("resume_extraction"):
+                text = await self._run_extraction(extractor, path, *args)
+            if self.cache is not None:
+                await self.cache.set(resume_id, text)
+        if path.endswith(".docx") and self.templates is not None and not self.templates.has_template(resume_id):
+            self.templates.save_template(resume_id, path)
+        return resume_id, text
+
+    async def get_resume(self, resume_id: str) -> Optional[str]:
+        """Return previously extracted resume text, or None if it is not cached."""
+        if self.cache is None:
+            return None
+        return await self.cache.get(resume_id)
     
     async def extract_job_description(self, url: str) -> str:
         """Extract job description from URL."""
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Get text
-        text = soup.get_text()
-        
-        # Break into lines and remove leading and trailing space
-        lines = (line.strip() for line in text.splitlines())
-        # Break multi-headlines into a line each
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        # Drop blank lines
-        text = '\n'.join(chunk for chunk in chunks if chunk)
-        
-        return text 
\ No newline at end of file
+        return await self.fetcher.fetch(url)
@@ -0,0 +1,311 @@
+import os
+import re
+import shutil
+import asyncio
+import logging
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+from services.cache import make_key
+from services.concurrency import SpawnPool
+from services.metrics import span
+from services.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when rendering changes so previously stored artifacts are not served for new output
+RENDERER_VERSION = "2"
+EXPORT_FORMATS = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf"
+}
+EXPORT_DOCUMENTS = ("updated_resume", "cover_letter")
+ARTIFACT_NAME = re.compile(r"^(updated_resume|cover_letter)-[0-9a-f]{64}\.(docx|pdf)$")
+TEMPLATE_NAME = re.compile(r"^[0-9a-f]{64}\.docx$")
+
+BULLET_PATTERN = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+")
+EMPHASIS_PATTERN = re.compile(r"(\*\*|__)(.+?)\1")
+
+PAGE_MARGIN = 72
+BULLET_INDENT = 14
+PDF_STYLES = {
+    # kind: (size, leading, space before)
+    "heading1": (16, 20, 10),
+    "heading2": (13, 17, 8),
+    "paragraph": (11, 14, 4),
+    "bullet": (11, 14, 2)
+}
+# Unicode fonts embedded in PDFs when EXPORT_PDF_FONT is not set, if installed
+DEFAULT_PDF_FONTS = (
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+)
+
+
+def parse_blocks(text: str) -> List[Tuple[str, str]]:
+    """Split generated text into `(kind, text)` blocks: heading1, heading2, bullet or paragraph.
+
+    Understands the Markdown the models tend to produce (`#` headings, `-`/`*`
+    bullets, `**bold**`); emphasis markers are dropped.
+    """
+    blocks = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        heading = HEADING_PATTERN.match(stripped)
+        if heading:
+            kind = "heading1" if len(heading.group(1)) == 1 else "heading2"
+            stripped = stripped[heading.end():]
+        elif BULLET_PATTERN.match(stripped):
+            kind = "bullet"
+            stripped = BULLET_PATTERN.sub("", stripped, count=1)
+        elif stripped.startswith("**") and stripped.endswith("**") and len(stripped) > 4:
+            kind = "heading2"
+        else:
+            kind = "paragraph"
+        blocks.append((kind, EMPHASIS_PATTERN.sub(r"\2", stripped).strip()))
+    return blocks
+
+
+def render_docx(text: str, output_path: str, template_path: Optional[str] = None):
+    """Write `text` as a DOCX, reusing the page setup and styles of `template_path`. Runs in a worker process."""
+    import docx
+    document = docx.Document(template_path) if template_path else docx.Document()
+    # Keep the section properties (page size, margins, headers) and drop the old content
+    body = document.element.body
+    for child in list(body):
+        if not child.tag.endswith("}sectPr"):
+            body.remove(child)
+    styles = {style.name for style in document.styles}
+    for kind, content in parse_blocks(text):
+        if kind.startswith("heading"):
+            style = "Heading 1" if kind == "heading1" else "Heading 2"
+            if style in styles:
+                document.add_paragraph(content, style=style)
+            else:
+                document.add_paragraph().add_run(content).bold = True
+        elif kind == "bullet":
+            if "List Bullet" in styles:
+                document.add_paragraph(content, style="List Bullet")
+            else:
+                document.add_paragraph(f"• {content}")
+        else:
+            document.add_paragraph(content)
+    document.save(output_path)
+
+
+def _unsupported_characters(pdf, family: str, blocks: List[Tuple[str, str]]) -> List[str]:
+    characters = {char for _, content in blocks for char in content}
+    if any(kind == "bullet" for kind, _ in blocks):
+        characters.add("•")
+    characters = sorted(characters)
+    if family in pdf.fonts:
+        # Embedded fonts: anything outside the regular or bold font's character map would print as a blank box
+        covered = [pdf.fonts[key].cmap for key in (family, f"{family}B")]
+        return [char for char in characters if not all(ord(char) in cmap for cmap in covered)]
+    return [char for char in characters if not char.encode(pdf.core_fonts_encoding, errors="ignore")]
+
+
+def render_pdf(text: str, output_path: str, fonts: Optional[Tuple[str, str]] = None):
+    """Write `text` as a Letter-size PDF. Runs in a worker process.
+
+    `fonts` are the regular and bold TrueType files to embed; without them the
+    built-in Helvetica fonts limit the text to Windows-1252. Text the fonts
+    cannot show raises ValueError instead of being replaced.
+    """
+    from fpdf import FPDF
+    pdf = FPDF(unit="pt", format="letter")
+    pdf.core_fonts_encoding = "windows-1252"
+    pdf.set_margins(PAGE_MARGIN, PAGE_MARGIN)
+    pdf.set_auto_page_break(True, margin=PAGE_MARGIN)
+    family = "helvetica"
+    if fonts:
+        family = "body"
+        pdf.add_font(family, "", fonts[0])
+        pdf.add_font(family, "B", fonts[1])
+
+    blocks = parse_blocks(text)
+    unsupported = _unsupported_characters(pdf, family, blocks)
+    if unsupported:
+        shown = " ".join(f"{char!r} (U+{ord(char):04X})" for char in unsupported[:10])
+        raise ValueError(f"The PDF font cannot show {len(unsupported)} character(s) in this text: {shown}; "
+                         f"export DOCX instead or set EXPORT_PDF_FONT to a font that covers them")
+
+    pdf.add_page()
+    for number, (kind, content) in enumerate(blocks):
+        size, leading, space_before = PDF_STYLES[kind]
+        pdf.set_font(family, "B" if kind.startswith("heading") else "", size)
+        if number:
+            pdf.ln(space_before)
+        if kind == "bullet":
+            pdf.set_x(PAGE_MARGIN + 2)
+            pdf.cell(BULLET_INDENT - 2, leading, "•")
+            pdf.set_left_margin(PAGE_MARGIN + BULLET_INDENT)
+        pdf.multi_cell(0, leading, content, new_x="LMARGIN", new_y="NEXT")
+        pdf.set_left_margin(PAGE_MARGIN)
+    pdf.output(output_path)
+
+
+def render_artifact(file_format: str, text: str, output_path: str, template_path: Optional[str] = None,
+                    fonts: Optional[Tuple[str, str]] = None):
+    """Render to a temporary file and move it into place, so readers never see a partial artifact."""
+    directory = os.path.dirname(output_path)
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix=f".{file_format}.tmp")
+    os.close(handle)
+    try:
+        if file_format == "docx":
+            render_docx(text, temp_path, template_path)
+        else:
+            render_pdf(text, temp_path, fonts)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class ExportService:
+    """Renders generated documents to DOCX/PDF in a worker pool and stores them content-addressed.
+
+    Artifacts are named by the hash of their inputs, so an export that was
+    rendered before is served from disk without touching the pool. Uploaded
+    DOCX resumes are kept as templates for their DOCX exports.
+    """
+
+    def __init__(self, directory: str, max_workers: int = 2, timeout: float = 30.0,
+                 max_bytes: int = 512 * 1024 * 1024, pdf_fonts: Optional[Tuple[str, str]] = None):
+        self.directory = directory
+        self.templates_dir = os.path.join(directory, "templates")
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.pdf_fonts = pdf_fonts
+        self.stats = {"rendered": 0, "reused": 0, "failed": 0}
+        os.makedirs(self.templates_dir, exist_ok=True)
+        self._pool = SpawnPool(max_workers)
+
+    def template_path(self, resume_id: Optional[str]) -> Optional[str]:
+        if not resume_id or not TEMPLATE_NAME.match(f"{resume_id}.docx"):
+            return None
+        path = os.path.join(self.templates_dir, f"{resume_id}.docx")
+        return path if os.path.exists(path) else None
+
+    def has_template(self, resume_id: str) -> bool:
+        return self.template_path(resume_id) is not None
+
+    def save_template(self, resume_id: str, source_path: str):
+        """Keep an uploaded DOCX resume, stored by its content hash, so exports can reuse its styles.
+
+        Templates share the store's `max_bytes` with the artifacts and are pruned
+        the same way, least recently used first.
+        """
+        path = os.path.join(self.templates_dir, f"{resume_id}.docx")
+        handle, temp_path = tempfile.mkstemp(dir=self.templates_dir, suffix=".docx.tmp")
+        os.close(handle)
+        try:
+            shutil.copyfile(source_path, temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self._prune()
+
+    def artifact_path(self, name: str) -> Optional[str]:
+        """Return the path of a stored artifact, or None for unknown or malformed names."""
+        if not ARTIFACT_NAME.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.exists(path) else None
+
+    async def export(self, document: str, file_format: str, text: str,
+                     resume_id: Optional[str] = None) -> Dict[str, object]:
+        """Render `text` unless an identical artifact exists and return its `name`, `etag` and `size`."""
+        if document not in EXPORT_DOCUMENTS:
+            raise ValueError(f"document must be one of {', '.join(EXPORT_DOCUMENTS)}")
+        if file_format not in EXPORT_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+        if not text.strip():
+            raise ValueError("Nothing to export")
+        template = self.template_path(resume_id) if file_format == "docx" else None
+        if template is not None:
+            # Keeps templates that are still exported from being pruned
+            os.utime(template)
+        fonts = self.pdf_fonts if file_format == "pdf" else None
+        digest = make_key("export", RENDERER_VERSION, document, file_format, text,
+                          os.path.basename(template) if template else "", *(fonts or ()))
+        name = f"{document}-{digest}.{file_format}"
+        path = os.path.join(self.directory, name)
+
+        cached = os.path.exists(path)
+        if cached:
+            self.stats["reused"] += 1
+            # Pruning goes by modification time, so a reused artifact counts as recent
+            os.utime(path)
+        else:
+            with span("export_render"):
+                await self._render(file_format, text, path, template, fonts)
+            self.stats["rendered"] += 1
+            self._prune()
+        return {"name": name, "etag": digest, "size": os.path.getsize(path), "cached": cached}
+
+    async def _render(self, file_format: str, text: str, path: str, template: Optional[str],
+                      fonts: Optional[Tuple[str, str]]):
+        try:
+            await self._pool.run(render_artifact, file_format, text, path, template, fonts, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.stats["failed"] += 1
+            raise RuntimeError(f"Rendering the {file_format} export timed out after {self.timeout}s")
+        except BrokenProcessPool:
+            self.stats["failed"] += 1
+            raise
+
+    def _prune(self):
+        """Delete the least recently used artifacts and templates once the store exceeds `max_bytes`."""
+        entries = []
+        for directory, pattern in ((self.directory, ARTIFACT_NAME), (self.templates_dir, TEMPLATE_NAME)):
+            for entry in os.scandir(directory):
+                if entry.is_file() and pattern.match(entry.name):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def get_stats(self) -> Dict[str, object]:
+        return {**self.stats, "directory": self.directory}
+
+    def close(self):
+        self._pool.close()
+
+
+def find_pdf_fonts(settings: Settings) -> Optional[Tuple[str, str]]:
+    """The regular and bold fonts to embed in PDFs: `EXPORT_PDF_FONT`/`EXPORT_PDF_BOLD_FONT`, else DejaVu Sans."""
+    regular = settings.export_pdf_font
+    if regular:
+        return regular, settings.export_pdf_bold_font or regular
+    if os.path.exists(DEFAULT_PDF_FONTS[0]):
+        bold = DEFAULT_PDF_FONTS[1] if os.path.exists(DEFAULT_PDF_FONTS[1]) else DEFAULT_PDF_FONTS[0]
+        return DEFAULT_PDF_FONTS[0], bold
+    logger.warning("No Unicode PDF font found; PDF exports are limited to Windows-1252 text (set EXPORT_PDF_FONT)")
+    return None
+
+
+def create_export_service(settings: Optional[Settings] = None) -> ExportService:
+    """Build the export service configured from the `EXPORT_*` settings."""
+    settings = settings or get_settings()
+    service = ExportService(
+        settings.export_dir,
+        max_workers=settings.export_workers,
+        timeout=settings.export_timeout,
+        max_bytes=settings.export_max_bytes,
+        pdf_fonts=find_pdf_fonts(settings)
+    )
+    logger.info(f"Storing exports in {settings.export_dir}")
+    return service
@@ -1,102 +1,93 @@
-import os
-import requests
+import json
 import logging
-from dotenv import load_dotenv
+from typing import AsyncIterator, Optional
+import httpx
+from services.base_llm_service import BaseLLMService
+from services.cache import TieredCache
+from services.resilience import ProviderError
+from services.http_client import get_http_client
+from services.settings import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
-class GitHubLLMService:
-    def __init__(self):
-        self.api_key = os.getenv("GITHUB_TOKEN")
+class GitHubLLMService(BaseLLMService):
+    provider_name = "github"
+
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None,
+                 cache: Optional[TieredCache] = None, settings: Optional[Settings] = None, state=None):
+        settings = settings or get_settings()
+        self.api_key = settings.github_token
         if not self.api_key:
             raise ValueError("GitHub token not found in environment variables")
+        super().__init__(model="openai/gpt-4.1", cache=cache, state=state, settings=settings)
+        self.http_client = http_client or get_http_client()
         
-        self.endpoint = "https://models.github.ai/inference"
-        self.model = "openai/gpt-4.1"
+        self.endpoint = settings.github_models_endpoint
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
     
-    async def _make_api_call(self, messages: list) -> str:
+    def _payload(self, messages: list, stream: bool = False, response_format: Optional[dict] = None) -> dict:
+        payload = {
+            "messages": messages,
+            "temperature": 1,
+            "top_p": 1,
+            "model": self.model
+        }
+        if stream:
+            payload["stream"] = True
+        if response_format:
+            payload["response_format"] = response_format
+        return payload
+
+    @staticmethod
+    def _to_provider_error(error: httpx.HTTPError) -> ProviderError:
+        if isinstance(error, httpx.HTTPStatusError):
+            response = error.response
+            logger.error(f"GitHub API error: {response.status_code} {response.text[:500]}")
+            return ProviderError.from_status(
+                f"GitHub API error {response.status_code}", response.status_code, response.headers
+            )
+        # Connection errors and timeouts are transient
+        logger.error(f"GitHub API error: {str(error)}")
+        return ProviderError(f"GitHub API error: {str(error) or error.__class__.__name__}", retryable=True)
+
+    async def _complete(self, messages: list, response_format: Optional[dict] = None) -> str:
         try:
-            response = requests.post(
+            response = await self.http_client.post(
                 f"{self.endpoint}/chat/completions",
                 headers=self.headers,
-                json={
-                    "messages": messages,
-                    "temperature": 1,
-                    "top_p": 1,
-                    "model": self.model
-                }
+                json=self._payload(messages, response_format=response_format),
+                timeout=self.call_timeout
             )
             response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
-        except Exception as e:
-            logger.error(f"GitHub API error: {str(e)}")
-            return f"Error: GitHub API error - {str(e)}"
-    
-    async def generate_tailored_resume(self, resume_content: str, job_description: str) -> str:
-        messages = [
-            {
-                "role": "system",
-                "content": "You are a professional resume writer."
-            },
-            {
-                "role": "user",
-                "content": f"""
-                Based on the following resume and job description, generate an updated resume that:
-                1. Highlights relevant experience and skills
-                2. Uses keywords from the job description
-                3. Maintains the original format and structure
-                4. Is tailored to the specific role
-                
-                Original Resume:
-                {resume_content}
-                
-                Job Description:
-                {job_description}
-                """
-            }
-        ]
-        return await self._make_api_call(messages)
-    
-    async def generate_cover_letter(self, resume_content: str, job_description: str) -> str:
-        messages = [
-            {
-                "role": "system",
-                "content": "You are an expert cover letter writer and hiring strategist."
-            },
-            {
-                "role": "user",
-                "content": f"""Using the resume and job description provided below, craft a highly compelling, polished, and professional cover letter for a deeply experienced candidate applying to this role.
-
-Your goal is to:
-    • Align the candidate's experience to the four most important requirements or focus areas in the job description.
-    • Highlight quantified impact and comparative framing (e.g., improved vs. baseline, outperforming past methods, industry benchmarks).
-    • Show strategic thinking and leadership beyond technical skills.
-    • Demonstrate clear interest in the company, industry, and mission.
-    • Close with a confident, engaging, and warm call to action.
+        except httpx.HTTPError as e:
+            raise self._to_provider_error(e)
+        data = response.json()
+        self.usage.record(self.provider_name, data.get("usage"))
+        return data["choices"][0]["message"]["content"]
 
-The voice should be:
-    • Executive-level and articulate
-    • Tailored to the company and role
-    • Insightful, not generic or templated
-    • 100% in prose (no bullets)
-
-⸻
-
-Inputs
-Candidate Resume:
-{resume_content}
-
-Job Description:
-{job_description}
-
-⸻
-
-Output:
-Write a tailored cover letter (1 page) addressed to the hiring team. Include candidate name and contact info at the top. Use a clear structure with an engaging opening, compelling middle focused on alignment and impact, and a strong, warm closing."""
-            }
-        ]
-        return await self._make_api_call(messages) 
\ No newline at end of file
+    async def _stream(self, messages: list) -> AsyncIterator[str]:
+        try:
+            async with self.http_client.stream(
+                "POST",
+                f"{self.endpoint}/chat/completions",
+                headers=self.headers,
+                json=self._payload(messages, stream=True),
+                timeout=self.call_timeout
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or []
+                    if choices and choices[0].get("delta", {}).get("content"):
+                        yield choices[0]["delta"]["content"]
+        except httpx.HTTPError as e:
+            raise self._to_provider_error(e)
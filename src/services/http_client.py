@@ -0,0 +1,29 @@
+import logging
+from typing import Optional
+import httpx
+from services.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def create_http_client(settings: Optional[Settings] = None) -> httpx.AsyncClient:
+    """Build a keep-alive connection pool sized from the `HTTP_*` settings."""
+    settings = settings or get_settings()
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry
+    )
+    timeout = httpx.Timeout(settings.http_timeout, connect=settings.http_connect_timeout)
+    logger.info(f"Creating HTTP connection pool: {limits}")
+    return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
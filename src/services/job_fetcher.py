@@ -0,0 +1,144 @@
+import re
+import time
+import asyncio
+import logging
+import importlib.util
+from typing import Iterable, List, Optional
+import httpx
+from services.cache import TieredCache, make_key
+from services.http_client import get_http_client
+from services.metrics import span
+from services.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+# Checked without importing lxml; BeautifulSoup loads it on first parse
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+
+
+# Elements that hold site chrome rather than posting content
+NON_CONTENT_TAGS = ["script", "style", "noscript", "svg", "iframe", "nav", "header", "footer", "aside", "form"]
+POSTING_CONTAINER = re.compile(r"job[-_ ]?(description|details|posting)|posting|description", re.IGNORECASE)
+MIN_MAIN_CONTENT_CHARS = 200
+
+# Short lines matching these are site chrome rather than part of a posting
+BOILERPLATE_PATTERNS = re.compile(
+    r"\bcookies?\b|privacy (policy|notice|settings)|terms (of (use|service)|and conditions)|"
+    r"all rights reserved|copyright|^©|\b(sign|log) ?(in|up|out)\b|\bsubscribe\b|"
+    r"share (this|on)|skip to (main )?content|follow us|accept all|"
+    r"^(home|menu|search|back|next|previous|close|apply|save|share|print|jobs|careers)$",
+    re.IGNORECASE
+)
+BOILERPLATE_MAX_WORDS = 15
+
+
+def _main_content(soup):
+    """Pick the element most likely to hold the posting, falling back to the whole page."""
+    candidates = [soup.find("main"), soup.find("article"), soup.find(attrs={"role": "main"})]
+    candidates += soup.find_all(id=POSTING_CONTAINER) + soup.find_all(class_=POSTING_CONTAINER)
+    candidates = [element for element in candidates if element is not None]
+    if candidates:
+        best = max(candidates, key=lambda element: len(element.get_text()))
+        if len(best.get_text(strip=True)) >= MIN_MAIN_CONTENT_CHARS:
+            return best
+    return soup.body or soup
+
+
+def strip_boilerplate(lines: Iterable[str]) -> List[str]:
+    """Drop short navigation, cookie banner and footer lines left on a scraped page."""
+    return [
+        line for line in lines
+        if not (len(line.split()) <= BOILERPLATE_MAX_WORDS and BOILERPLATE_PATTERNS.search(line))
+    ]
+
+
+def html_to_text(html: str) -> str:
+    """Extract the visible text of a posting's main content, one phrase per line."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, HTML_PARSER)
+
+    # Remove script, style and navigation elements
+    for element in soup(NON_CONTENT_TAGS):
+        element.decompose()
+
+    # Get text
+    text = _main_content(soup).get_text()
+
+    # Break into lines and remove leading and trailing space
+    lines = (line.strip() for line in text.splitlines())
+    # Break multi-headlines into a line each
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    # Drop blank lines and leftover chrome such as cookie banners
+    return '\n'.join(strip_boilerplate(chunk for chunk in chunks if chunk))
+
+
+class JobPostingFetcher:
+    """Fetch job postings over the shared connection pool with an HTTP response cache.
+
+    Cached pages are served without a request while fresh, and revalidated
+    with a conditional GET (ETag / Last-Modified) once they go stale.
+    """
+
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None,
+                 cache: Optional[TieredCache] = None, settings: Optional[Settings] = None):
+        settings = settings or get_settings()
+        self.http_client = http_client or get_http_client()
+        self.cache = cache
+        self.max_bytes = settings.job_fetch_max_bytes
+        self.fresh_for = settings.job_fetch_fresh_seconds
+        self.timeout = httpx.Timeout(settings.job_fetch_read_timeout, connect=settings.job_fetch_connect_timeout)
+
+    async def fetch(self, url: str) -> str:
+        """Return the visible text of the job posting at `url`."""
+        key = make_key("job_page", "v3", url)
+        entry = await self.cache.get(key) if self.cache is not None else None
+        if entry is not None and time.time() - entry["fetched_at"] < self.fresh_for:
+            logger.info(f"Job page cache hit for {url}")
+            return entry["text"]
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        with span("job_fetch"):
+            async with self.http_client.stream(
+                "GET", url, headers=headers, timeout=self.timeout, follow_redirects=True
+            ) as response:
+                if response.status_code == 304 and entry is not None:
+                    logger.info(f"Job page not modified: {url}")
+                    entry["fetched_at"] = time.time()
+                    await self.cache.set(key, entry)
+                    return entry["text"]
+                response.raise_for_status()
+                html = await self._read_limited(response)
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+
+        # Parsing is CPU-bound, keep it off the event loop
+        loop = asyncio.get_running_loop()
+        with span("html_clean"):
+            text = await loop.run_in_executor(None, html_to_text, html)
+
+        if self.cache is not None:
+            await self.cache.set(key, {
+                "text": text,
+                "etag": etag,
+                "last_modified": last_modified,
+                "fetched_at": time.time()
+            })
+        return text
+
+    async def _read_limited(self, response: httpx.Response) -> str:
+        chunks = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.max_bytes:
+                logger.warning(f"Job page exceeds {self.max_bytes} bytes, truncating: {response.url}")
+                break
+        content = b"".join(chunks)[:self.max_bytes]
+        return content.decode(response.encoding or "utf-8", errors="replace")
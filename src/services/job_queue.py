@@ -0,0 +1,296 @@
+import os
+import json
+import time
+import uuid
+import random
+import sqlite3
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from services.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class JobQueue:
+    """SQLite-backed job queue with priorities, retries and a bounded worker pool.
+
+    Several processes can share one database. A claimed job holds a lease that
+    its worker renews while it runs; jobs whose lease expires (their process
+    died) are put back in the queue and picked up by any process, unless they
+    have used up their attempts, so a job that kills its worker fails for good.
+    """
+
+    def __init__(self, path: str, handler: JobHandler, workers: int = 4, max_attempts: int = 3,
+                 retry_backoff: float = 5.0, poll_interval: float = 1.0, retention: float = 7 * 24 * 3600,
+                 lease_seconds: float = 60.0):
+        self.path = path
+        self.handler = handler
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.lease_seconds = lease_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, priority INTEGER NOT NULL, "
+            "payload TEXT NOT NULL, result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+            "run_after REAL NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, created_at)"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+        if "lease_expires" not in columns:
+            try:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN lease_expires REAL")
+            except sqlite3.OperationalError:
+                # Another process added it first
+                pass
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._running: Dict[int, str] = {}
+        self._draining = False
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    async def start(self):
+        """Recover interrupted jobs, purge expired ones and start the workers."""
+        await self._run(self._recover)
+        self._draining = False
+        self._tasks = [asyncio.ensure_future(self._worker(n)) for n in range(self.workers)]
+        logger.info(f"Job queue started with {self.workers} workers ({self.path})")
+
+    async def stop(self, drain_timeout: float = 0.0):
+        """Stop claiming jobs, let running ones finish for up to `drain_timeout` seconds, then cancel.
+
+        Jobs still running at the deadline go straight back to the queue for
+        another process (or the next start) without using up an attempt.
+        """
+        self._draining = True
+        self._wakeup.set()
+        if self._tasks and drain_timeout > 0:
+            if self._running:
+                logger.info(f"Draining {len(self._running)} running jobs (up to {drain_timeout}s)")
+            await asyncio.wait(self._tasks, timeout=drain_timeout)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        interrupted = list(self._running.values())
+        self._running.clear()
+        if interrupted:
+            logger.warning(f"Returning {len(interrupted)} interrupted jobs to the queue")
+            await self._run(self._release, interrupted)
+        with self._lock:
+            self._conn.close()
+
+    async def enqueue(self, payload: Dict[str, Any], priority: int = 0) -> str:
+        """Add a job and return its id. Higher priorities run first."""
+        job_id = uuid.uuid4().hex
+        await self._run(self._insert, job_id, payload, priority)
+        self._wakeup.set()
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self._select, job_id)
+
+    async def get_stats(self) -> Dict[str, int]:
+        return await self._run(self._count_by_status)
+
+    async def _worker(self, number: int):
+        while not self._draining:
+            job = await self._run(self._claim)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            logger.info(f"Worker {number} running job {job['id']} (attempt {job['attempts']})")
+            self._running[number] = job["id"]
+            heartbeat = asyncio.ensure_future(self._heartbeat(job["id"]))
+            try:
+                result = await self.handler(job["payload"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job {job['id']} failed: {str(e)}")
+                await self._run(self._fail, job, str(e) or e.__class__.__name__)
+            else:
+                await self._run(self._complete, job["id"], result)
+            finally:
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+            self._running.pop(number, None)
+
+    async def _heartbeat(self, job_id: str):
+        """Renew a running job's lease so other processes do not reclaim it."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self._run(self._renew, job_id)
+            except Exception as e:
+                # A busy database must not end the heartbeat; the next renewal may still beat the lease
+                logger.warning(f"Could not renew the lease of job {job_id}: {str(e)}")
+
+    def _renew(self, job_id: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = 'running'",
+                (time.time() + self.lease_seconds, job_id)
+            )
+
+    def _release(self, job_ids: List[str]):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), lease_expires = NULL, "
+                "run_after = ?, updated_at = ? WHERE id = ? AND status = 'running'",
+                [(now, now, job_id) for job_id in job_ids]
+            )
+
+    def _expire_leases(self, now: float):
+        """Requeue running jobs whose lease ran out, failing those that have no attempts left.
+
+        Must be called inside a transaction with the lock held.
+        """
+        # Only jobs whose lease ran out: others may be running in a live process
+        expired = "status = 'running' AND (lease_expires IS NULL OR lease_expires < ?)"
+        self._conn.execute(
+            f"UPDATE jobs SET status = 'failed', error = 'lease expired', lease_expires = NULL, updated_at = ? "
+            f"WHERE {expired} AND attempts >= ?",
+            (now, now, self.max_attempts)
+        )
+        self._conn.execute(
+            f"UPDATE jobs SET status = 'queued', lease_expires = NULL, updated_at = ? WHERE {expired}",
+            (now, now)
+        )
+
+    def _recover(self):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._expire_leases(now)
+                self._conn.execute(
+                    "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+                    (now - self.retention,)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _insert(self, job_id: str, payload: Dict[str, Any], priority: int):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, priority, payload, run_after, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, priority, json.dumps(payload), now, now, now)
+            )
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock so two workers cannot claim the same row
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs of a process that died without releasing them become claimable again
+                self._expire_leases(now)
+                row = self._conn.execute(
+                    "SELECT id, payload, attempts FROM jobs WHERE status = 'queued' AND run_after <= ? "
+                    "ORDER BY priority DESC, created_at LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_expires = ?, "
+                        "updated_at = ? WHERE id = ?",
+                        (now + self.lease_seconds, now, row[0])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return {"id": row[0], "payload": json.loads(row[1]), "attempts": row[2] + 1}
+
+    def _complete(self, job_id: str, result: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, updated_at = ? WHERE id = ?",
+                (json.dumps(result), time.time(), job_id)
+            )
+
+    def _fail(self, job: Dict[str, Any], error: str):
+        now = time.time()
+        with self._lock:
+            if job["attempts"] >= self.max_attempts:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                    (error, now, job["id"])
+                )
+                return
+            # Exponential backoff with jitter before the next attempt
+            delay = self.retry_backoff * 2 ** (job["attempts"] - 1) * random.uniform(0.5, 1.5)
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', error = ?, run_after = ?, updated_at = ? WHERE id = ?",
+                (error, now + delay, now, job["id"])
+            )
+
+    def _select(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, priority, result, error, attempts, created_at, updated_at "
+                "FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "priority": row[2],
+            "result": json.loads(row[3]) if row[3] else None,
+            "error": row[4],
+            "attempts": row[5],
+            "created_at": row[6],
+            "updated_at": row[7]
+        }
+
+    def _count_by_status(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys(("queued", "running", "succeeded", "failed"), 0)
+        counts.update(rows)
+        return counts
+
+
+def create_job_queue(handler: JobHandler, settings: Optional[Settings] = None) -> JobQueue:
+    """Build the job queue configured from the `JOB_*` settings."""
+    settings = settings or get_settings()
+    return JobQueue(
+        settings.job_queue_path,
+        handler,
+        workers=settings.job_workers,
+        max_attempts=settings.job_max_attempts,
+        retry_backoff=settings.job_retry_backoff,
+        lease_seconds=settings.job_lease_seconds
+    )
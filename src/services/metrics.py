@@ -0,0 +1,219 @@
+import os
+import time
+import cProfile
+import random
+import asyncio
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+from services.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+# LLM calls take seconds to minutes, so the buckets reach well past the defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+STAGE_SECONDS = Histogram(
+    "resume_generator_stage_seconds", "Time spent in each request stage", ["stage"], buckets=LATENCY_BUCKETS
+)
+LLM_CALL_SECONDS = Histogram(
+    "resume_generator_llm_call_seconds", "LLM call latency including retries",
+    ["provider", "outcome"], buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter(
+    "resume_generator_llm_tokens_total", "Tokens reported by the LLM providers", ["provider", "type"]
+)
+REQUEST_SECONDS = Histogram(
+    "resume_generator_request_seconds", "HTTP request latency until the response starts",
+    ["method", "path", "status"], buckets=LATENCY_BUCKETS
+)
+
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "resume_generator_event_loop_lag_seconds", "How late the event loop ran a timer scheduled by the lag monitor",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+
+# Spans recorded while handling the current request, for the Server-Timing header
+_request_spans: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "request_spans", default=None
+)
+
+
+def start_request_spans() -> List[Tuple[str, float]]:
+    """Begin collecting spans for the current request; tasks it starts share the list."""
+    spans: List[Tuple[str, float]] = []
+    _request_spans.set(spans)
+    return spans
+
+
+def record_span(stage: str, seconds: float):
+    STAGE_SECONDS.labels(stage).observe(seconds)
+    spans = _request_spans.get()
+    if spans is not None:
+        spans.append((stage, seconds))
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time a block as `stage`, whether it succeeds or raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(stage, time.perf_counter() - started)
+
+
+def record_llm_call(provider: str, seconds: float, ok: bool):
+    LLM_CALL_SECONDS.labels(provider, "ok" if ok else "error").observe(seconds)
+    record_span(f"llm_{provider}", seconds)
+
+
+def record_llm_tokens(provider: str, prompt: int, cached: int, completion: int):
+    LLM_TOKENS.labels(provider, "prompt").inc(prompt)
+    LLM_TOKENS.labels(provider, "cached_prompt").inc(cached)
+    LLM_TOKENS.labels(provider, "completion").inc(completion)
+
+
+async def monitor_event_loop_lag(interval: float = 0.1):
+    """Measure how long blocking work delays the event loop, until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - started - interval))
+
+
+def format_server_timing(spans: List[Tuple[str, float]], total: float) -> str:
+    """Render spans as a Server-Timing header value (durations in milliseconds)."""
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in spans]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Render this process' metrics, or every worker's when `PROMETHEUS_MULTIPROC_DIR` is set."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class SlowRequestProfiler:
+    """Profile a sample of requests and keep the profiles of those slower than a threshold.
+
+    Uses pyinstrument when installed (async-aware HTML reports), otherwise
+    cProfile (`.prof` files for `pstats`/snakeviz). Only one request is
+    profiled at a time, and cProfile also sees other requests running
+    concurrently on the event loop.
+    """
+
+    def __init__(self, sample_rate: float, slow_seconds: float, directory: str):
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+        self.directory = directory
+        self._lock = threading.Lock()
+        self.saved = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def start(self):
+        """Return a running profiler for this request, or None if it is not sampled."""
+        if random.random() >= self.sample_rate or not self._lock.acquire(blocking=False):
+            return None
+        if Profiler is not None:
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        return profiler
+
+    def stop(self, profiler, name: str, seconds: float):
+        try:
+            if Profiler is not None:
+                profiler.stop()
+            else:
+                profiler.disable()
+            if seconds < self.slow_seconds:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            base = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{seconds:.1f}s")
+            if Profiler is not None:
+                path = base + ".html"
+                with open(path, "w") as report:
+                    report.write(profiler.output_html())
+            else:
+                path = base + ".prof"
+                profiler.dump_stats(path)
+            self.saved += 1
+            logger.info(f"Saved profile of slow request ({seconds:.1f}s) to {path}")
+        finally:
+            self._lock.release()
+
+
+class RequestTimingMiddleware:
+    """Time each HTTP request, export it to Prometheus and optionally profile it or add Server-Timing.
+
+    A pure ASGI middleware: `BaseHTTPMiddleware` would run the endpoint behind a
+    wrapped `receive`, hiding client disconnects from `Request.is_disconnected`.
+    The request histogram measures the time until the response starts; a
+    sampled profile covers the whole response, including any stream.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        state = scope["app"].state if scope.get("app") is not None else None
+        if scope["type"] != "http" or state is None or not hasattr(state, "profiler"):
+            await self.app(scope, receive, send)
+            return
+
+        spans = start_request_spans()
+        profiler = state.profiler
+        running_profiler = profiler.start() if profiler.enabled else None
+        started = time.perf_counter()
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - started
+                route = scope.get("route")
+                REQUEST_SECONDS.labels(
+                    scope["method"], route.path if route is not None else "unmatched", str(message["status"])
+                ).observe(elapsed)
+                if state.settings.server_timing:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", format_server_timing(spans, elapsed).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            if running_profiler is not None:
+                name = scope["path"].strip("/").replace("/", "_") or "root"
+                profiler.stop(running_profiler, name, time.perf_counter() - started)
+
+
+def create_profiler(settings: Optional[Settings] = None) -> SlowRequestProfiler:
+    """Build the slow-request profiler configured from the `PROFILE_*` settings (off by default)."""
+    settings = settings or get_settings()
+    return SlowRequestProfiler(
+        sample_rate=settings.profile_sample_rate,
+        slow_seconds=settings.profile_slow_seconds,
+        directory=settings.profile_dir
+    )
+
@@ -0,0 +1,303 @@
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+from services.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class ProviderError(Exception):
+    """An LLM provider call failed; `retryable` tells the guard whether to try again."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None,
+                 retry_after: Optional[float] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+    @classmethod
+    def from_status(cls, message: str, status_code: int, headers=None) -> "ProviderError":
+        return cls(
+            message,
+            status_code=status_code,
+            retry_after=parse_retry_after(headers.get("retry-after")) if headers else None,
+            retryable=status_code in RETRYABLE_STATUS_CODES
+        )
+
+
+class CircuitOpenError(ProviderError):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = rate_per_minute
+        self.rate = rate_per_minute / 60.0
+        self.tokens = rate_per_minute
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until `amount` tokens are available and take them."""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+    async def drain(self, seconds: float):
+        """Empty the bucket so nothing is sent for about `seconds` (e.g. after a 429)."""
+        self._refill()
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class CircuitBreaker:
+    """Open after `failure_threshold` consecutive failures; allow one trial call after `reset_timeout`.
+
+    While half-open, the first caller becomes the probe and everyone else is
+    rejected as if the circuit were open until the probe succeeds or fails.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self, name: str) -> bool:
+        """Admit a call or raise `CircuitOpenError`; returns True if the call is the half-open probe."""
+        state = self.state
+        if state == "open":
+            retry_after = self.reset_timeout - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError(f"{name} is unavailable (circuit open)", retry_after=retry_after)
+        if state == "half_open":
+            if self.probing:
+                raise CircuitOpenError(f"{name} is unavailable (circuit half-open, trial call in progress)")
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+    def release_probe(self):
+        """The probe ended without an outcome (cancelled, or a non-retryable error); the next caller probes."""
+        self.probing = False
+
+
+class LatencyTracker:
+    """Rolling latency and error rate over a provider's most recent calls."""
+
+    def __init__(self, window: int = 100):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+
+    def record_success(self, seconds: float):
+        self.latencies.append(seconds)
+        self.outcomes.append(True)
+
+    def record_failure(self):
+        self.outcomes.append(False)
+
+    @property
+    def samples(self) -> int:
+        return len(self.latencies)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def get_stats(self) -> Dict[str, Any]:
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        return {
+            "samples": self.samples,
+            "p50": round(p50, 3) if p50 is not None else None,
+            "p95": round(p95, 3) if p95 is not None else None,
+            "error_rate": round(self.error_rate, 3)
+        }
+
+
+class ProviderGuard:
+    """Rate limiting, retry with backoff and a circuit breaker around one provider."""
+
+    def __init__(self, name: str, requests_per_minute: float, tokens_per_minute: float,
+                 max_retries: int = 3, backoff_base: float = 1.0, backoff_max: float = 30.0,
+                 breaker: Optional[CircuitBreaker] = None, state=None):
+        self.name = name
+        if state is not None:
+            # Buckets shared by every worker process through the state backend
+            self.request_bucket = state.create_bucket(f"{name}:requests", requests_per_minute)
+            self.token_bucket = state.create_bucket(f"{name}:tokens", tokens_per_minute)
+        else:
+            self.request_bucket = TokenBucket(requests_per_minute)
+            self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = {"calls": 0, "retries": 0, "failures": 0, "rejected": 0}
+
+    def _backoff(self, attempt: int, error: ProviderError) -> float:
+        if error.retry_after is not None:
+            return min(error.retry_after, self.backoff_max)
+        # Full jitter keeps retries from many requests from synchronising
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _admit(self, estimated_tokens: int) -> bool:
+        """Pass the breaker and rate limits; returns True if this attempt is the breaker's probe."""
+        try:
+            probe = self.breaker.before_call(self.name)
+        except CircuitOpenError:
+            self.stats["rejected"] += 1
+            raise
+        try:
+            await self.request_bucket.acquire(1)
+            await self.token_bucket.acquire(estimated_tokens)
+        except BaseException:
+            if probe:
+                self.breaker.release_probe()
+            raise
+        self.stats["calls"] += 1
+        return probe
+
+    async def _handle_failure(self, attempt: int, error: ProviderError, probe: bool):
+        """Record a failed attempt, then either sleep before the retry or re-raise."""
+        if not error.retryable:
+            if probe:
+                self.breaker.release_probe()
+            raise error
+        self.breaker.record_failure()
+        if error.status_code == 429 and error.retry_after:
+            await self.request_bucket.drain(error.retry_after)
+        if attempt >= self.max_retries:
+            self.stats["failures"] += 1
+            raise error
+        delay = self._backoff(attempt, error)
+        self.stats["retries"] += 1
+        logger.warning(f"{self.name} call failed ({error}), retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+    async def call(self, func: Callable[[], Awaitable[Any]], estimated_tokens: int = 0) -> Any:
+        """Run `func` under the rate limits, retrying retryable `ProviderError`s."""
+        attempt = 0
+        while True:
+            probe = await self._admit(estimated_tokens)
+            try:
+                result = await func()
+            except ProviderError as e:
+                await self._handle_failure(attempt, e, probe)
+                attempt += 1
+                continue
+            except BaseException:
+                if probe:
+                    self.breaker.release_probe()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def stream(self, func: Callable[[], AsyncIterator[str]], estimated_tokens: int = 0) -> AsyncIterator[str]:
+        """Like `call` for streams; retries only happen before the first delta is yielded."""
+        attempt = 0
+        while True:
+            probe = await self._admit(estimated_tokens)
+            started = False
+            try:
+                async for delta in func():
+                    started = True
+                    yield delta
+            except ProviderError as e:
+                if started:
+                    self.breaker.record_failure()
+                    self.stats["failures"] += 1
+                    raise
+                await self._handle_failure(attempt, e, probe)
+                attempt += 1
+                continue
+            except BaseException:
+                # Also reached when the consumer stops reading the stream early
+                if probe:
+                    self.breaker.release_probe()
+                raise
+            self.breaker.record_success()
+            return
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "circuit": self.breaker.state}
+
+
+def create_provider_guard(name: str, state=None, settings: Optional[Settings] = None) -> ProviderGuard:
+    """Build a guard configured from the `<NAME>_*` rate-limit and `LLM_*` retry settings.
+
+    With a `state` backend (see `services.state`) the rate limits are shared across processes.
+    """
+    settings = settings or get_settings()
+    requests_per_minute, tokens_per_minute = settings.rate_limits(name)
+    return ProviderGuard(
+        name,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+        max_retries=settings.llm_max_retries,
+        backoff_base=settings.llm_backoff_base,
+        backoff_max=settings.llm_backoff_max,
+        breaker=CircuitBreaker(
+            failure_threshold=settings.llm_circuit_failure_threshold,
+            reset_timeout=settings.llm_circuit_reset_timeout
+        ),
+        state=state
+    )
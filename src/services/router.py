@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import importlib
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from services.admission import AdmissionController
+from services.base_llm_service import BaseLLMService, DocumentGenerator
+from services.cache import TieredCache
+from services.compaction import InputCompactor
+from services.metrics import span
+from services.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Calls needed before a provider's own p95 is trusted as the hedge delay
+MIN_HEDGE_SAMPLES = 10
+# Error rate weight when ranking providers: 10% errors counts like 50% more latency
+ERROR_RATE_PENALTY = 5.0
+
+# Imported on first use so provider SDKs stay out of startup
+PROVIDER_CLASSES = {
+    "openai": "services.llm_service:LLMService",
+    "github": "services.github_llm_service:GitHubLLMService"
+}
+
+
+def load_provider_services(services: Dict[str, BaseLLMService], **options) -> Dict[str, BaseLLMService]:
+    """Add a service for every configured provider missing from `services`.
+
+    `options` are passed to each service class (`http_client`, `cache`,
+    `settings`, `state`). Providers without credentials are skipped.
+    """
+    for name, path in PROVIDER_CLASSES.items():
+        if name not in services:
+            module_name, class_name = path.split(":")
+            service_class = getattr(importlib.import_module(module_name), class_name)
+            try:
+                services[name] = service_class(**options)
+            except ValueError as e:
+                logger.warning(f"Provider {name} unavailable: {str(e)}")
+    return services
+
+
+class ProviderRouter(DocumentGenerator):
+    """Route generation calls across providers with fallback and optional hedging.
+
+    With a `preferred` provider, calls go to it first and only move to another
+    provider when it fails. Without one ("auto"), providers are ranked by
+    rolling median latency and error rate, skipping any whose circuit is open.
+    When `hedge` is set, a second request is sent to the next provider if the
+    first has not answered within its p95 latency, and the slower one is cancelled.
+
+    The router owns no rate limits, breaker or latency stats of its own; those
+    belong to the provider services it wraps. Results are cached under the
+    provider that answered (see `DocumentGenerator`).
+
+    With an `admission` controller, every call that goes to a provider other
+    than the first choice (a fallback or hedge) holds a slot on that provider's
+    gate for its duration; the first choice's slot is held by the request.
+    """
+
+    def __init__(self, services: Dict[str, BaseLLMService], preferred: Optional[str] = None,
+                 hedge: bool = False, fallback: bool = True, cache: Optional[TieredCache] = None,
+                 settings: Optional[Settings] = None, admission: Optional[AdmissionController] = None):
+        if not services:
+            raise ValueError("No LLM providers are configured")
+        if preferred is not None and preferred not in services:
+            raise ValueError(f"Provider {preferred} is not configured")
+        super().__init__(cache=cache, settings=settings)
+        self.services = services
+        self.preferred = preferred
+        self.hedge = hedge
+        self.fallback = fallback
+        self.admission = admission
+        self.hedge_delay = self.settings.llm_hedge_delay
+        self.hedge_min_delay = self.settings.llm_hedge_min_delay
+        self.stats = {"fallbacks": 0, "hedges": 0, "hedge_wins": 0}
+
+    def _score(self, service: BaseLLMService) -> float:
+        median = service.latency.percentile(0.5)
+        if median is None:
+            # Untried providers go first so every provider gets measured
+            return 0.0
+        return median * (1 + ERROR_RATE_PENALTY * service.latency.error_rate)
+
+    def ranked(self) -> List[BaseLLMService]:
+        """Providers in the order they should be tried."""
+        if self.preferred is not None:
+            first = self.services[self.preferred]
+            others = [service for name, service in self.services.items() if name != self.preferred]
+            ordered = [first] + sorted(others, key=self._score)
+        else:
+            ordered = sorted(self.services.values(), key=self._score)
+        # Open circuits fail fast, so they are tried last rather than dropped
+        ordered.sort(key=lambda service: service.guard.breaker.state == "open")
+        return ordered if self.fallback else ordered[:1]
+
+    def _delay_for(self, service: BaseLLMService) -> float:
+        if service.latency.samples < MIN_HEDGE_SAMPLES:
+            return self.hedge_delay
+        return max(self.hedge_min_delay, service.latency.percentile(0.95))
+
+    def _first_choice(self) -> BaseLLMService:
+        return self.ranked()[0]
+
+    def compact_inputs(self, resume_content: str, job_description: str):
+        """Trim inputs to the smallest budgets among the providers a fallback or hedge may reach."""
+        services = self.ranked()
+        budgets = [self.settings.token_budgets(service.provider_name) for service in services]
+        compactor = InputCompactor(
+            services[0].provider_name, services[0].model, settings=self.settings,
+            budgets=(min(resume for resume, _ in budgets), min(job for _, job in budgets))
+        )
+        with span("input_compaction"):
+            return compactor.compact(resume_content, job_description)
+
+    @asynccontextmanager
+    async def _slot(self, service: BaseLLMService, position: int):
+        """Hold an admission slot on `service` unless it is the first choice, whose slot the request holds."""
+        if position == 0 or self.admission is None:
+            yield
+            return
+        release = await self.admission.gate(service.provider_name).acquire()
+        try:
+            yield
+        finally:
+            release()
+
+    async def _call(self, service: BaseLLMService, position: int, messages: list,
+                    response_format: Optional[dict]) -> str:
+        async with self._slot(service, position):
+            return await service.complete(messages, response_format=response_format)
+
+    async def _answer(self, messages: list, response_format: Optional[dict] = None) -> Tuple[BaseLLMService, str]:
+        services = self.ranked()
+        if self.hedge and len(services) > 1:
+            return await self._hedged(services, messages, response_format)
+
+        for position, service in enumerate(services):
+            try:
+                return service, await self._call(service, position, messages, response_format)
+            except Exception as e:
+                if position == len(services) - 1:
+                    raise
+                self.stats["fallbacks"] += 1
+                logger.warning(f"{service.provider_name} failed ({e}), falling back to "
+                               f"{services[position + 1].provider_name}")
+
+    async def _hedged(self, services: List[BaseLLMService], messages: list,
+                      response_format: Optional[dict]) -> Tuple[BaseLLMService, str]:
+        """Race the first two providers, starting the second only if the first is slow or fails."""
+        primary, secondary = services[0], services[1]
+        tasks = {asyncio.ensure_future(self._call(primary, 0, messages, response_format)): primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._delay_for(primary))
+            if not done:
+                self.stats["hedges"] += 1
+                logger.info(f"{primary.provider_name} is slow, hedging with {secondary.provider_name}")
+            elif next(iter(done)).exception() is None:
+                return primary, next(iter(done)).result()
+            else:
+                self.stats["fallbacks"] += 1
+                logger.warning(f"{primary.provider_name} failed ({next(iter(done)).exception()}), "
+                               f"falling back to {secondary.provider_name}")
+                tasks.clear()
+            tasks[asyncio.ensure_future(self._call(secondary, 1, messages, response_format))] = secondary
+
+            error: Optional[BaseException] = None
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    service = tasks.pop(task)
+                    if task.exception() is None:
+                        if service is secondary and primary in tasks.values():
+                            self.stats["hedge_wins"] += 1
+                        return service, task.result()
+                    error = task.exception()
+                    logger.warning(f"{service.provider_name} failed ({error})")
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _answer_stream(self, messages: list) -> AsyncIterator[Tuple[BaseLLMService, str]]:
+        """Stream from the best provider, falling back only if it fails before the first delta."""
+        services = self.ranked()
+        for position, service in enumerate(services):
+            started = False
+            try:
+                async with self._slot(service, position):
+                    async for delta in service.stream(messages):
+                        started = True
+                        yield service, delta
+                return
+            except Exception as e:
+                if started or position == len(services) - 1:
+                    raise
+                self.stats["fallbacks"] += 1
+                logger.warning(f"{service.provider_name} stream failed ({e}), falling back to "
+                               f"{services[position + 1].provider_name}")
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            **self.stats,
+            "order": [service.provider_name for service in self.ranked()]
+        }
@@ -0,0 +1,164 @@
+import re
+from typing import List
+
+# Section headings by the part of the resume they introduce; anything else is kept as written
+SECTION_KINDS = {
+    "summary": (
+        "summary", "professional summary", "career summary", "executive summary", "profile",
+        "professional profile", "objective", "career objective", "about", "about me", "overview"
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience", "relevant experience", "employment",
+        "employment history", "work history", "career history", "projects", "key projects"
+    ),
+    "skills": (
+        "skills", "technical skills", "key skills", "core skills", "core competencies", "competencies",
+        "skills and tools", "technologies", "tools and technologies"
+    ),
+    "other": (
+        "education", "certifications", "certificates", "licenses", "awards", "honors", "publications",
+        "volunteer experience", "volunteering", "languages", "interests", "references", "training"
+    )
+}
+HEADINGS = {heading: kind for kind, headings in SECTION_KINDS.items() for heading in headings}
+MAX_HEADING_WORDS = 4
+
+BULLET_PREFIX = re.compile(r"^\s*(?:[-*•▪‣◦]|\d+[.)])\s+")
+DATE_RANGE = re.compile(
+    r"\b(?:(?:19|20)\d{2}|present|current)\b.{0,20}?(?:-|–|—|\bto\b).{0,20}?"
+    r"\b(?:(?:19|20)\d{2}|present|current|now|today)\b",
+    re.IGNORECASE
+)
+TERM_PATTERN = re.compile(r"[a-z][a-z0-9+#]*(?:[.-][a-z0-9+#]+)*")
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can could do does
+each either etc experience for from has have having in including into is it its job may more most must
+nice not of on or other our over per plus preferred required requirements role should such team than
+that the their them then there these they this those through to under using via was we well were what
+when where which while who will with within work working years you your
+""".split())
+# Requirements sharing this many terms (or all of theirs) with an experience entry are relevant to it
+MIN_SHARED_TERMS = 2
+
+
+class ResumeSection:
+    """A contiguous part of a resume: its header, a section, or one experience entry."""
+
+    def __init__(self, kind: str, name: str, lines: List[str]):
+        self.kind = kind
+        self.name = name
+        self.lines = lines
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    @property
+    def tailorable(self) -> bool:
+        return self.kind in ("summary", "experience", "skills")
+
+
+def terms(text: str) -> set:
+    """Content words of a text, lowercased, without stopwords and very short words."""
+    return {term for term in TERM_PATTERN.findall(text.lower()) if len(term) > 2 and term not in STOPWORDS}
+
+
+def heading_kind(line: str) -> str:
+    """Return the kind of section a line introduces, or an empty string if it is not a heading."""
+    cleaned = re.sub(r"^#+\s*|\*\*|__|:$", "", line.strip()).strip()
+    if not cleaned or len(cleaned.split()) > MAX_HEADING_WORDS:
+        return ""
+    normalized = " ".join(re.sub(r"[^a-z ]", " ", cleaned.lower().replace("&", "and")).split())
+    if normalized in HEADINGS:
+        return HEADINGS[normalized]
+    # Short all-caps lines may be headings ("LEADERSHIP") or employer names ("ACME CORP")
+    if cleaned.isupper() and not DATE_RANGE.search(cleaned):
+        return "unknown"
+    return ""
+
+
+def _split_entries(lines: List[str]) -> List[List[str]]:
+    """Split an experience section into entries, each starting at a role's title or date line."""
+    entries: List[List[str]] = [[]]
+    for line in lines:
+        current = entries[-1]
+        has_bullets = any(BULLET_PREFIX.match(existing) for existing in current)
+        if DATE_RANGE.search(line) and has_bullets:
+            # The title line above the dates belongs to the new entry
+            title = [current.pop()] if current and not BULLET_PREFIX.match(current[-1]) else []
+            entries.append(title + [line])
+        else:
+            current.append(line)
+    return [entry for entry in entries if entry]
+
+
+def split_resume_sections(text: str) -> List[ResumeSection]:
+    """Split extracted resume text into its header, sections and individual experience entries.
+
+    Joining the sections' text with newlines reproduces the resume without its
+    blank lines.
+    """
+    groups = []
+    kind, heading, lines = "header", None, []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        line_kind = heading_kind(line)
+        if line_kind == "unknown":
+            # Inside experience an all-caps line is more likely an employer than a new section
+            line_kind = "" if kind == "experience" else "other"
+        if line_kind:
+            groups.append((kind, heading, lines))
+            kind, heading, lines = line_kind, line.strip(), []
+        else:
+            lines.append(line.rstrip())
+    groups.append((kind, heading, lines))
+
+    sections = []
+    for kind, heading, lines in groups:
+        if heading is None and not lines:
+            continue
+        title = re.sub(r"^#+\s*|\*\*|__|:$", "", heading).strip().title() if heading else "Header"
+        if kind != "experience":
+            sections.append(ResumeSection(kind, title, ([heading] if heading else []) + lines))
+            continue
+        # The heading stays on its own so each entry can be rewritten and cached separately
+        sections.append(ResumeSection("heading", title, [heading]))
+        for number, entry in enumerate(_split_entries(lines), start=1):
+            sections.append(ResumeSection("experience", f"{title} {number}", entry))
+    return sections
+
+
+def extract_requirements(job_description: str) -> List[str]:
+    """Normalised requirement statements from a job description: one per bullet or sentence."""
+    requirements = []
+    seen = set()
+    for line in job_description.splitlines():
+        line = BULLET_PREFIX.sub("", line).strip()
+        for sentence in re.split(r"(?<=[.;!?])\s+", line):
+            normalized = " ".join(sentence.lower().split()).rstrip(".;")
+            if terms(normalized) and normalized not in seen:
+                seen.add(normalized)
+                requirements.append(normalized)
+    return requirements
+
+
+def relevant_requirements(section: ResumeSection, requirements: List[str]) -> List[str]:
+    """The requirements a section should be tailored to; empty when it should be kept as written.
+
+    The summary speaks to the whole posting, skills to any requirement naming one
+    of them, and an experience entry to requirements sharing several terms with it.
+    """
+    if section.kind == "summary":
+        return sorted(requirements)
+    if section.kind not in ("skills", "experience"):
+        return []
+    section_terms = terms(section.text)
+    relevant = []
+    for requirement in requirements:
+        requirement_terms = terms(requirement)
+        needed = 1 if section.kind == "skills" else min(MIN_SHARED_TERMS, len(requirement_terms))
+        if len(requirement_terms & section_terms) >= needed:
+            relevant.append(requirement)
+    # Sorted so that reordering the posting does not change which cached section is used
+    return sorted(relevant)
@@ -0,0 +1,170 @@
+import os
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# The project root is two levels up from this file's package
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+def _flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() == "true"
+
+
+class Settings:
+    """Application configuration, read once per process.
+
+    Values come from the environment, then from the project's `.env` file for
+    anything the environment does not set. A missing provider key only makes
+    that provider unavailable; it is reported when the provider is first used.
+    Per-provider and per-cache values are read the first time that provider or
+    cache asks for them and kept from then on. Every service takes its
+    configuration from here; only the process launchers (`serve.py`,
+    `gunicorn.conf.py`) and prometheus_client's `PROMETHEUS_MULTIPROC_DIR`
+    use the environment directly.
+    """
+
+    def __init__(self, env_file: Optional[Path] = None):
+        env_file = env_file or PROJECT_ROOT / ".env"
+        if env_file.exists():
+            load_dotenv(dotenv_path=env_file)
+            logger.info(f"Loaded environment from {env_file}")
+
+        self.openai_api_key = os.getenv("OPENAI_API_KEY")
+        self.openai_base_url = os.getenv("OPENAI_BASE_URL") or None
+        self.github_token = os.getenv("GITHUB_TOKEN")
+        self.github_models_endpoint = os.getenv(
+            "GITHUB_MODELS_ENDPOINT", "https://models.github.ai/inference"
+        ).rstrip("/")
+
+        self.llm_hedge = _flag("LLM_HEDGE", "false")
+        self.llm_fallback = _flag("LLM_FALLBACK", "true")
+        self.preload_providers = _flag("PRELOAD_PROVIDERS", "false")
+        self.batch_concurrency = int(os.getenv("BATCH_CONCURRENCY", "8"))
+        self.batch_max_jobs = int(os.getenv("BATCH_MAX_JOBS", "50"))
+        self.server_timing = _flag("SERVER_TIMING", "false")
+        self.event_loop_lag_interval = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.1"))
+        self.shutdown_drain_timeout = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "30"))
+
+        # LLM calls; per-provider rate limits and token budgets are read by the methods below
+        self.llm_call_timeout = float(os.getenv("LLM_CALL_TIMEOUT", "120"))
+        self.llm_document_timeout = float(os.getenv("LLM_DOCUMENT_TIMEOUT", "300"))
+        self.llm_max_retries = int(os.getenv("LLM_MAX_RETRIES", "3"))
+        self.llm_backoff_base = float(os.getenv("LLM_BACKOFF_BASE", "1"))
+        self.llm_backoff_max = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+        self.llm_circuit_failure_threshold = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+        self.llm_circuit_reset_timeout = float(os.getenv("LLM_CIRCUIT_RESET_TIMEOUT", "30"))
+        self.llm_hedge_delay = float(os.getenv("LLM_HEDGE_DELAY", "15"))
+        self.llm_hedge_min_delay = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1"))
+        # Per-provider overrides of the rate limits below, e.g. from bulk.py's command line
+        self.requests_per_minute: Dict[str, float] = {}
+        self.tokens_per_minute: Dict[str, float] = {}
+        self._rate_limits: Dict[str, Tuple[float, float]] = {}
+        self._token_budgets: Dict[str, Tuple[int, int]] = {}
+        self._cache_options: Dict[str, Dict[str, Any]] = {}
+
+        # Outbound HTTP connection pool
+        self.http_max_connections = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+        self.http_max_keepalive_connections = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+        self.http_keepalive_expiry = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+        self.http_timeout = float(os.getenv("HTTP_TIMEOUT", "120"))
+        self.http_connect_timeout = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+
+        # Job posting fetches
+        self.job_fetch_max_bytes = int(os.getenv("JOB_FETCH_MAX_BYTES", str(2 * 1024 * 1024)))
+        self.job_fetch_fresh_seconds = float(os.getenv("JOB_FETCH_FRESH_SECONDS", "3600"))
+        self.job_fetch_read_timeout = float(os.getenv("JOB_FETCH_READ_TIMEOUT", "10"))
+        self.job_fetch_connect_timeout = float(os.getenv("JOB_FETCH_CONNECT_TIMEOUT", "5"))
+
+        # Resume extraction
+        self.extraction_workers = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.extraction_timeout = float(os.getenv("EXTRACTION_TIMEOUT", "20"))
+        self.max_resume_pages = int(os.getenv("MAX_RESUME_PAGES", "20"))
+        self.max_resume_chars = int(os.getenv("MAX_RESUME_CHARS", "100000"))
+        self.max_resume_bytes = int(os.getenv("MAX_RESUME_BYTES", str(10 * 1024 * 1024)))
+
+        # Caches and state shared between worker processes
+        self.cache_dir = os.getenv("CACHE_DIR", ".cache")
+        self.state_backend = os.getenv("STATE_BACKEND", "sqlite").lower()
+        self.state_path = os.getenv("STATE_PATH", os.path.join(".data", "state.sqlite3"))
+        self.redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self.redis_prefix = os.getenv("REDIS_PREFIX", "resume-generator")
+        self.job_similarity = _flag("JOB_SIMILARITY", "true")
+        self.job_similarity_threshold = float(os.getenv("JOB_SIMILARITY_THRESHOLD", "0.9"))
+        self.job_similarity_max_entries = int(os.getenv("JOB_SIMILARITY_MAX_ENTRIES", "100000"))
+
+        # Background job queue
+        self.job_queue_path = os.getenv("JOB_QUEUE_PATH", os.path.join(".data", "jobs.sqlite3"))
+        self.job_workers = int(os.getenv("JOB_WORKERS", "4"))
+        self.job_max_attempts = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        self.job_retry_backoff = float(os.getenv("JOB_RETRY_BACKOFF", "5"))
+        self.job_lease_seconds = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+        # Admission control
+        self.admission_max_in_flight = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "8"))
+        self.admission_max_queue = int(os.getenv("ADMISSION_MAX_QUEUE", "16"))
+        self.admission_queue_timeout = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))
+        self.admission_max_pending = int(os.getenv("ADMISSION_MAX_PENDING", "64"))
+        self.max_upload_bytes = int(os.getenv("MAX_UPLOAD_BYTES", str(11 * 1024 * 1024)))
+
+        # DOCX/PDF exports
+        self.export_dir = os.getenv("EXPORT_DIR", os.path.join(".data", "exports"))
+        self.export_workers = int(os.getenv("EXPORT_WORKERS", str(min(2, os.cpu_count() or 1))))
+        self.export_timeout = float(os.getenv("EXPORT_TIMEOUT", "30"))
+        self.export_max_bytes = int(os.getenv("EXPORT_MAX_BYTES", str(512 * 1024 * 1024)))
+        self.export_pdf_font = os.getenv("EXPORT_PDF_FONT") or None
+        self.export_pdf_bold_font = os.getenv("EXPORT_PDF_BOLD_FONT") or None
+
+        # Slow-request profiling
+        self.profile_sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+        self.profile_slow_seconds = float(os.getenv("PROFILE_SLOW_SECONDS", "5"))
+        self.profile_dir = os.getenv("PROFILE_DIR", os.path.join(".data", "profiles"))
+
+    def rate_limits(self, provider: str) -> Tuple[float, float]:
+        """Requests and tokens per minute for `provider`, from `<PROVIDER>_REQUESTS/TOKENS_PER_MINUTE`."""
+        if provider not in self._rate_limits:
+            prefix = provider.upper()
+            self._rate_limits[provider] = (
+                float(os.getenv(f"{prefix}_REQUESTS_PER_MINUTE", "60")),
+                float(os.getenv(f"{prefix}_TOKENS_PER_MINUTE", "150000"))
+            )
+        requests, tokens = self._rate_limits[provider]
+        requests_override = self.requests_per_minute.get(provider)
+        tokens_override = self.tokens_per_minute.get(provider)
+        return (
+            requests if requests_override is None else requests_override,
+            tokens if tokens_override is None else tokens_override
+        )
+
+    def token_budgets(self, provider: str) -> Tuple[int, int]:
+        """Resume and job description token budgets for `provider`, from `<PROVIDER>_*_TOKEN_BUDGET`."""
+        if provider not in self._token_budgets:
+            prefix = provider.upper()
+            self._token_budgets[provider] = (
+                int(os.getenv(f"{prefix}_RESUME_TOKEN_BUDGET", "4000")),
+                int(os.getenv(f"{prefix}_JOB_TOKEN_BUDGET", "3000"))
+            )
+        return self._token_budgets[provider]
+
+    def cache_options(self, name: str) -> Dict[str, Any]:
+        """Options for the `name` cache, from `<NAME>_CACHE_*`."""
+        if name not in self._cache_options:
+            prefix = f"{name.upper()}_CACHE"
+            self._cache_options[name] = {
+                "ttl": float(os.getenv(f"{prefix}_TTL", str(7 * 24 * 3600))),
+                "max_entries": int(os.getenv(f"{prefix}_MAX_ENTRIES", "256")),
+                "disk": _flag(f"{prefix}_DISK", "true"),
+                "max_disk_entries": int(os.getenv(f"{prefix}_MAX_DISK_ENTRIES", "10000")),
+                "max_bytes": int(os.getenv(f"{prefix}_MAX_BYTES", str(256 * 1024 * 1024)))
+            }
+        return dict(self._cache_options[name])
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, loading them on first call."""
+    return Settings()
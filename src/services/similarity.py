@@ -0,0 +1,233 @@
+import os
+import re
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+from array import array
+from typing import Any, Dict, List, Optional, Set
+from services.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_SIZE = 64
+SHINGLE_WORDS = 3
+# Added per step when an empty signature slot borrows its neighbour's value
+DENSIFY_OFFSET = 0x9E3779B1
+
+URL_PATTERN = re.compile(r"https?://[^\s?#]+[^\s]*")
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:[+#.'][a-z0-9]+)*[+#]*")
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def normalize_job_text(text: str) -> List[List[str]]:
+    """Lowercase words of each line of a posting, with URL query strings and punctuation removed."""
+    # Tracking parameters and fragments change between re-listings of the same posting
+    text = URL_PATTERN.sub(lambda match: re.split(r"[?#]", match.group(0))[0], text.lower())
+    return [words for words in (WORD_PATTERN.findall(line) for line in text.splitlines()) if words]
+
+
+def shingle_set(text: str, shingle_words: int = SHINGLE_WORDS) -> Set[str]:
+    """Word shingles of a posting, taken within lines so reordered lines and sections still match."""
+    shingles = set()
+    for words in normalize_job_text(text):
+        if len(words) <= shingle_words:
+            shingles.add(" ".join(words))
+            continue
+        shingles.update(" ".join(words[i:i + shingle_words]) for i in range(len(words) - shingle_words + 1))
+    return shingles
+
+
+def minhash_signature(text: str, size: int = SIGNATURE_SIZE) -> Optional[array]:
+    """MinHash signature of a posting's shingles, or None for text without words.
+
+    Uses one-permutation hashing: each shingle is hashed once and the hash picks
+    the slot it competes for, so a signature costs one hash per shingle rather
+    than one per shingle and slot. Empty slots borrow from the next filled one.
+    """
+    shingles = shingle_set(text)
+    if not shingles:
+        return None
+    empty = 0xFFFFFFFF
+    signature = array("I", [empty] * size)
+    for shingle in shingles:
+        value = _hash64(shingle.encode("utf-8"))
+        slot = value % size
+        low = value >> 32
+        if low < signature[slot]:
+            signature[slot] = low
+    for slot in range(size):
+        if signature[slot] != empty:
+            continue
+        for step in range(1, size):
+            neighbour = signature[(slot + step) % size]
+            if neighbour != empty:
+                signature[slot] = (neighbour + step * DENSIFY_OFFSET) % empty
+                break
+    return signature
+
+
+def estimate_similarity(first: array, second: array) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+
+def band_rows(threshold: float, size: int = SIGNATURE_SIZE) -> int:
+    """Rows per LSH band so that postings at `threshold` similarity almost always share a band.
+
+    The band count `b` and rows `r` put the S-curve's midpoint at about
+    `(1/b)^(1/r)`; the largest `r` with its midpoint below the threshold keeps
+    candidates few while rarely missing a true match.
+    """
+    rows = 1
+    for candidate in range(1, size + 1):
+        if size % candidate == 0 and (candidate / size) ** (1 / candidate) <= threshold:
+            rows = candidate
+    return rows
+
+
+class JobSimilarityIndex:
+    """LSH index of job posting signatures, scoped per resume and provider.
+
+    Each stored posting points at the result cache entry holding the documents
+    generated for it. Band hashes live in an indexed SQLite table, so a lookup
+    is one indexed query plus a signature comparison per candidate, and every
+    worker process on the host sees the same index.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.9, max_entries: int = 100000,
+                 size: int = SIGNATURE_SIZE):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.size = size
+        self.rows = band_rows(threshold, size)
+        self.stats = {"lookups": 0, "matches": 0, "added": 0}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # The index can be rebuilt from new requests, so commits skip the fsync
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "id INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, job_digest TEXT NOT NULL, "
+            "signature BLOB NOT NULL, result_key TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS bands (band INTEGER NOT NULL, posting_id INTEGER NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS bands_band ON bands (band)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS bands_posting_id ON bands (posting_id)")
+        self._conn.commit()
+
+    def _bands(self, scope: str, signature: array) -> List[int]:
+        scope_bytes = scope.encode("utf-8")
+        bands = []
+        for start in range(0, self.size, self.rows):
+            band = _hash64(scope_bytes + start.to_bytes(2, "little") + signature[start:start + self.rows].tobytes())
+            # SQLite integers are signed 64-bit
+            bands.append(band - (1 << 63))
+        return bands
+
+    def find(self, scope: str, signature: array) -> Optional[Dict[str, Any]]:
+        """Return the most similar stored posting in `scope` at or above the threshold."""
+        bands = self._bands(scope, signature)
+        with self._lock:
+            self.stats["lookups"] += 1
+            rows = self._conn.execute(
+                "SELECT DISTINCT p.job_digest, p.signature, p.result_key FROM bands b "
+                f"JOIN postings p ON p.id = b.posting_id WHERE b.band IN ({','.join('?' * len(bands))})",
+                bands
+            ).fetchall()
+        best = None
+        for job_digest, stored, result_key in rows:
+            similarity = estimate_similarity(signature, array("I", stored))
+            if similarity >= self.threshold and (best is None or similarity > best["similarity"]):
+                best = {"similarity": similarity, "job_digest": job_digest, "result_key": result_key}
+        if best is not None:
+            self.stats["matches"] += 1
+        return best
+
+    def add(self, scope: str, signature: array, job_digest: str, result_key: str):
+        """Record that documents for this posting are cached under `result_key`."""
+        bands = self._bands(scope, signature)
+        key = hashlib.sha256(f"{scope}:{job_digest}".encode("utf-8")).hexdigest()
+        with self._lock:
+            self.stats["added"] += 1
+            row = self._conn.execute("SELECT id FROM postings WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._delete(row[0])
+            cursor = self._conn.execute(
+                "INSERT INTO postings (key, job_digest, signature, result_key, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, job_digest, signature.tobytes(), result_key, time.time())
+            )
+            self._conn.executemany(
+                "INSERT INTO bands (band, posting_id) VALUES (?, ?)", [(band, cursor.lastrowid) for band in bands]
+            )
+            self._evict(cursor.lastrowid)
+            self._conn.commit()
+
+    def _delete(self, posting_id: int):
+        self._conn.execute("DELETE FROM bands WHERE posting_id = ?", (posting_id,))
+        self._conn.execute("DELETE FROM postings WHERE id = ?", (posting_id,))
+
+    def _evict(self, newest_id: int):
+        # Ids grow with insertion order, so this keeps at most the newest `max_entries` postings
+        cutoff = newest_id - self.max_entries
+        if cutoff <= 0:
+            return
+        self._conn.execute("DELETE FROM bands WHERE posting_id <= ?", (cutoff,))
+        self._conn.execute("DELETE FROM postings WHERE id <= ?", (cutoff,))
+
+    def _lookup(self, scope: str, job_text: str):
+        signature = minhash_signature(job_text, self.size)
+        return signature, self.find(scope, signature) if signature is not None else None
+
+    async def lookup(self, scope: str, job_text: str):
+        """Return `(signature, match)` for a posting; pass the signature to `remember` afterwards."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._lookup, scope, job_text)
+
+    async def remember(self, scope: str, signature: Optional[array], job_digest: str, result_key: str):
+        if signature is None:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.add, scope, signature, job_digest, result_key)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "entries": len(self),
+            "threshold": self.threshold,
+            "band_rows": self.rows,
+            "match_rate": self.stats["matches"] / self.stats["lookups"] if self.stats["lookups"] else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_job_index(settings: Optional[Settings] = None) -> Optional[JobSimilarityIndex]:
+    """Build the near-duplicate posting index from the `JOB_SIMILARITY_*` settings, or None when disabled."""
+    settings = settings or get_settings()
+    if not settings.job_similarity:
+        return None
+    path = os.path.join(settings.cache_dir, "job_similarity.sqlite3")
+    index = JobSimilarityIndex(
+        path,
+        threshold=settings.job_similarity_threshold,
+        max_entries=settings.job_similarity_max_entries
+    )
+    logger.info(f"Created job similarity index at {path} (threshold {index.threshold}, {index.rows} rows per band)")
+    return index
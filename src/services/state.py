@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+from services.cache import SQLiteCache
+from services.resilience import TokenBucket
+from services.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class SharedTokenBucket:
+    """Token bucket whose state lives in a `SharedStateBackend`, so every worker process shares it.
+
+    Has the same `acquire`/`drain` interface as the in-process `TokenBucket`.
+    """
+
+    def __init__(self, backend: "SharedStateBackend", key: str, rate_per_minute: float):
+        self.backend = backend
+        self.key = key
+        self.capacity = rate_per_minute
+        self.rate = rate_per_minute / 60.0
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until `amount` tokens are available and take them."""
+        amount = min(amount, self.capacity)
+        loop = asyncio.get_running_loop()
+        while True:
+            wait = await loop.run_in_executor(
+                None, self.backend.take_tokens, self.key, amount, self.capacity, self.rate
+            )
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    async def drain(self, seconds: float):
+        """Empty the bucket so no process sends anything for about `seconds` (e.g. after a 429)."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.backend.drain_tokens, self.key, seconds, self.capacity, self.rate)
+
+
+def _refill(tokens: Optional[float], updated_at: Optional[float], capacity: float, rate: float, now: float) -> float:
+    if tokens is None:
+        return capacity
+    return min(capacity, tokens + (now - updated_at) * rate)
+
+
+class StateBackend(ABC):
+    """State shared by the worker processes: rate-limit buckets and the shared cache tier."""
+
+    name = "base"
+
+    @abstractmethod
+    def create_bucket(self, key: str, rate_per_minute: float):
+        """A token bucket with the `acquire`/`drain` interface of `TokenBucket`."""
+
+    @abstractmethod
+    def create_cache_tier(self, name: str, ttl: Optional[float], max_entries: int, max_bytes: int):
+        """The second cache tier for `name`, in front of which `TieredCache` keeps its LRU."""
+
+    def close(self):
+        pass
+
+
+class SharedStateBackend(StateBackend):
+    """A backend whose token buckets live in storage that every worker process reaches."""
+
+    def create_bucket(self, key: str, rate_per_minute: float):
+        return SharedTokenBucket(self, key, rate_per_minute)
+
+    @abstractmethod
+    def take_tokens(self, key: str, amount: float, capacity: float, rate: float) -> float:
+        """Take `amount` tokens if available and return 0, otherwise return the seconds to wait."""
+
+    @abstractmethod
+    def drain_tokens(self, key: str, seconds: float, capacity: float, rate: float):
+        """Empty the bucket and hold it empty for `seconds`."""
+
+
+class MemoryStateBackend(StateBackend):
+    """Per-process buckets; only suitable for a single worker. Caches still use SQLite files."""
+
+    name = "memory"
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def create_bucket(self, key: str, rate_per_minute: float):
+        return TokenBucket(rate_per_minute)
+
+    def create_cache_tier(self, name: str, ttl: Optional[float], max_entries: int, max_bytes: int):
+        return SQLiteCache(os.path.join(self.cache_dir, f"{name}.sqlite3"), ttl=ttl,
+                           max_entries=max_entries, max_bytes=max_bytes)
+
+
+class SQLiteStateBackend(SharedStateBackend):
+    """Buckets and caches in SQLite files shared by every worker process on the host."""
+
+    name = "sqlite"
+
+    def __init__(self, cache_dir: str, path: str):
+        self.cache_dir = cache_dir
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def create_cache_tier(self, name: str, ttl: Optional[float], max_entries: int, max_bytes: int):
+        return SQLiteCache(os.path.join(self.cache_dir, f"{name}.sqlite3"), ttl=ttl,
+                           max_entries=max_entries, max_bytes=max_bytes)
+
+    def _update(self, key: str, capacity: float, rate: float, change) -> Any:
+        with self._lock:
+            # BEGIN IMMEDIATE serialises read-modify-write across processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens = _refill(row[0] if row else None, row[1] if row else None, capacity, rate, now)
+                tokens, result = change(tokens)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)", (key, tokens, now)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def take_tokens(self, key: str, amount: float, capacity: float, rate: float) -> float:
+        def take(tokens: float):
+            if tokens >= amount:
+                return tokens - amount, 0.0
+            return tokens, (amount - tokens) / rate
+        return self._update(key, capacity, rate, take)
+
+    def drain_tokens(self, key: str, seconds: float, capacity: float, rate: float):
+        self._update(key, capacity, rate, lambda tokens: (min(tokens, -seconds * rate), None))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisCache:
+    """Cache tier stored in Redis with a TTL; Redis' own eviction policy bounds its size."""
+
+    def __init__(self, client, name: str, ttl: Optional[float] = None, prefix: str = "resume-generator"):
+        self.client = client
+        self.path = f"redis:{prefix}:cache:{name}"
+        self.prefix = f"{prefix}:cache:{name}:"
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any):
+        self.client.set(self.prefix + key, json.dumps(value), ex=int(self.ttl) if self.ttl else None)
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def close(self):
+        pass
+
+
+class RedisStateBackend(SharedStateBackend):
+    """Buckets and caches in Redis, shared across processes and hosts.
+
+    Takes any client with the synchronous `redis.Redis` interface, so a local
+    stand-in such as `fakeredis.FakeRedis` can replace a server in tests.
+    """
+
+    name = "redis"
+
+    def __init__(self, client, prefix: str = "resume-generator"):
+        self.client = client
+        self.prefix = prefix
+
+    def create_cache_tier(self, name: str, ttl: Optional[float], max_entries: int, max_bytes: int):
+        return RedisCache(self.client, name, ttl=ttl, prefix=self.prefix)
+
+    def _update(self, key: str, capacity: float, rate: float, change) -> Any:
+        from redis.exceptions import WatchError
+        redis_key = f"{self.prefix}:bucket:{key}"
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    # Optimistic transaction: retried if another process changes the bucket meanwhile
+                    pipe.watch(redis_key)
+                    stored = pipe.hmget(redis_key, "tokens", "updated_at")
+                    now = time.time()
+                    tokens = _refill(
+                        float(stored[0]) if stored[0] is not None else None,
+                        float(stored[1]) if stored[1] is not None else None,
+                        capacity, rate, now
+                    )
+                    tokens, result = change(tokens)
+                    pipe.multi()
+                    pipe.hset(redis_key, mapping={"tokens": tokens, "updated_at": now})
+                    # A full bucket carries no information, so idle buckets can expire
+                    pipe.expire(redis_key, int(capacity / rate) + 60)
+                    pipe.execute()
+                    return result
+                except WatchError:
+                    continue
+
+    def take_tokens(self, key: str, amount: float, capacity: float, rate: float) -> float:
+        def take(tokens: float):
+            if tokens >= amount:
+                return tokens - amount, 0.0
+            return tokens, (amount - tokens) / rate
+        return self._update(key, capacity, rate, take)
+
+    def drain_tokens(self, key: str, seconds: float, capacity: float, rate: float):
+        self._update(key, capacity, rate, lambda tokens: (min(tokens, -seconds * rate), None))
+
+    def close(self):
+        self.client.close()
+
+
+def create_state_backend(redis_client=None, settings: Optional[Settings] = None) -> StateBackend:
+    """Build the backend named by the `STATE_BACKEND` setting (`sqlite`, `redis` or `memory`)."""
+    settings = settings or get_settings()
+    kind = settings.state_backend
+    cache_dir = settings.cache_dir
+    if kind == "redis" or redis_client is not None:
+        if redis_client is None:
+            import redis
+            redis_client = redis.Redis.from_url(settings.redis_url)
+        backend: StateBackend = RedisStateBackend(redis_client, prefix=settings.redis_prefix)
+    elif kind == "memory":
+        backend = MemoryStateBackend(cache_dir)
+    elif kind == "sqlite":
+        backend = SQLiteStateBackend(cache_dir, settings.state_path)
+    else:
+        raise ValueError(f"Unknown STATE_BACKEND {kind!r}")
+    logger.info(f"Using {backend.name} state backend")
+    return backend
@@ -0,0 +1,16 @@
+import os
+import sys
+import pytest
+
+# The services are imported the way the API imports them, relative to src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from services.settings import get_settings
+
+
+@pytest.fixture(autouse=True)
+def fresh_settings():
+    # Settings are read once per process; tests that set environment variables need them read again
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
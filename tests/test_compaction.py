@@ -0,0 +1,15 @@
+from services.compaction import InputCompactor
+from services.settings import Settings
+
+# Requirement lines that mention words also found in site chrome
+JOB = """Privacy Engineer
+Experience with privacy policy reviews and GDPR cookie consent
+Build sign in and sign up flows with OAuth
+Apply threat modelling to new features
+Experience with privacy policy reviews and GDPR cookie consent"""
+
+
+def test_pasted_descriptions_keep_every_requirement():
+    compactor = InputCompactor("openai", settings=Settings())
+    lines = compactor.compact_job_description(JOB).splitlines()
+    assert lines == JOB.splitlines()[:4]
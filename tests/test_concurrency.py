@@ -0,0 +1,24 @@
+import os
+import time
+import asyncio
+import pytest
+from services.concurrency import SpawnPool
+
+
+def test_spawn_pool_kills_hung_workers_and_retries_calls_caught_in_the_reset():
+    async def scenario(pool: SpawnPool):
+        first_pid = await pool.run(os.getpid, timeout=30)
+        # The hung call's timeout resets the pool under the slow call, which is retried on a fresh pool
+        slow = asyncio.ensure_future(pool.run(time.sleep, 1, timeout=30))
+        await asyncio.sleep(0.1)
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(time.sleep, 60, timeout=0.3)
+        await slow
+        return first_pid, await pool.run(os.getpid, timeout=30)
+
+    pool = SpawnPool(max_workers=2)
+    try:
+        first_pid, second_pid = asyncio.run(scenario(pool))
+    finally:
+        pool.close()
+    assert first_pid != second_pid
@@ -0,0 +1,57 @@
+import os
+import time
+import pytest
+from PyPDF2 import PdfReader
+from services.export import DEFAULT_PDF_FONTS, ExportService, render_pdf
+
+
+def write_file(path: str, size: int) -> str:
+    with open(path, "wb") as output:
+        output.write(b"x" * size)
+    return path
+
+
+def test_templates_are_stored_by_hash_and_pruned_with_the_artifacts(tmp_path):
+    service = ExportService(str(tmp_path / "exports"), max_bytes=2500)
+    try:
+        old_id, new_id = "a" * 64, "b" * 64
+        service.save_template(old_id, write_file(str(tmp_path / "old.docx"), 1000))
+        # Pruning goes by modification time; make the first template clearly older
+        old_path = service.template_path(old_id)
+        os.utime(old_path, (time.time() - 60, time.time() - 60))
+        service.save_template(new_id, write_file(str(tmp_path / "new.docx"), 1000))
+        assert service.has_template(old_id) and service.has_template(new_id)
+
+        artifact = write_file(os.path.join(service.directory, f"cover_letter-{'c' * 64}.pdf"), 1000)
+        service._prune()
+
+        assert not service.has_template(old_id)
+        assert service.has_template(new_id)
+        assert os.path.exists(artifact)
+        assert sorted(os.listdir(service.templates_dir)) == [f"{new_id}.docx"]
+    finally:
+        service.close()
+
+
+def pdf_text(path: str) -> str:
+    return "".join(page.extract_text() for page in PdfReader(path).pages)
+
+
+@pytest.mark.skipif(not os.path.exists(DEFAULT_PDF_FONTS[0]), reason="DejaVu Sans is not installed")
+def test_pdf_embeds_a_unicode_font(tmp_path):
+    path = str(tmp_path / "resume.pdf")
+    render_pdf("# Zoë Ødegaard\n- Санкт-Петербург – “Łódź”", path, (DEFAULT_PDF_FONTS[0], DEFAULT_PDF_FONTS[0]))
+
+    text = pdf_text(path)
+    assert "Zoë Ødegaard" in text
+    assert "Санкт-Петербург" in text
+    assert "?" not in text
+
+
+def test_pdf_rejects_text_the_font_cannot_show(tmp_path):
+    path = str(tmp_path / "resume.pdf")
+    render_pdf("Café – “quoted” résumé", path)
+    assert "Café – “quoted” résumé" in pdf_text(path)
+
+    with pytest.raises(ValueError, match="U\\+674E"):
+        render_pdf("Li Lei 李雷", str(tmp_path / "cjk.pdf"))
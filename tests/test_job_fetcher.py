@@ -0,0 +1,100 @@
+import sys
+import asyncio
+import importlib
+import httpx
+import pytest
+from services import job_fetcher
+from services.cache import LRUCache, TieredCache
+
+URL = "https://jobs.example.com/postings/42"
+PAGE = """<html><body><nav>Home | Careers</nav>
+<main><h1>Senior Backend Engineer</h1><p>Build Python services.</p></main>
+<footer>Copyright</footer></body></html>"""
+
+
+def make_fetcher(handler, **settings) -> job_fetcher.JobPostingFetcher:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    fetcher = job_fetcher.JobPostingFetcher(http_client=client, cache=TieredCache("job_page", LRUCache()))
+    for name, value in settings.items():
+        setattr(fetcher, name, value)
+    return fetcher
+
+
+def test_stale_pages_are_revalidated_with_a_conditional_get():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, html=PAGE, headers={
+            "ETag": '"v1"', "Last-Modified": "Wed, 01 May 2024 10:00:00 GMT"
+        })
+
+    # Every cached page is stale at once, so the second fetch must revalidate
+    fetcher = make_fetcher(handler, fresh_for=0)
+    first = asyncio.run(fetcher.fetch(URL))
+    second = asyncio.run(fetcher.fetch(URL))
+
+    assert "Senior Backend Engineer" in first and "Careers" not in first
+    assert second == first
+    assert len(requests) == 2
+    assert "If-None-Match" not in requests[0].headers
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+    assert requests[1].headers["If-Modified-Since"] == "Wed, 01 May 2024 10:00:00 GMT"
+
+
+def test_fresh_pages_are_served_without_a_request():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, html=PAGE)
+
+    fetcher = make_fetcher(handler)
+    assert asyncio.run(fetcher.fetch(URL)) == asyncio.run(fetcher.fetch(URL))
+    assert len(requests) == 1
+
+
+def test_large_pages_are_truncated_without_reading_the_rest():
+    sent = []
+
+    async def body():
+        yield b"<html><body><main><p>" + b"a" * 1000
+        for _ in range(100):
+            sent.append(1)
+            yield b"b" * 1000
+
+    fetcher = make_fetcher(lambda request: httpx.Response(200, content=body()), max_bytes=4000)
+    text = asyncio.run(fetcher.fetch(URL))
+
+    assert len(text) <= 4000
+    assert text.startswith("a" * 1000)
+    assert len(sent) < 100
+
+
+@pytest.fixture
+def without_lxml(monkeypatch):
+    # find_spec reports a module as missing when sys.modules maps it to None
+    monkeypatch.setitem(sys.modules, "lxml", None)
+    importlib.reload(job_fetcher)
+    yield
+    monkeypatch.undo()
+    importlib.reload(job_fetcher)
+
+
+def test_html_parser_is_used_when_lxml_is_missing(without_lxml):
+    assert job_fetcher.HTML_PARSER == "html.parser"
+    fetcher = make_fetcher(lambda request: httpx.Response(200, html=PAGE))
+    text = asyncio.run(fetcher.fetch(URL))
+    assert "Senior Backend Engineer" in text and "Build Python services." in text
+    assert "Careers" not in text and "Copyright" not in text
+
+
+def test_chrome_left_inside_the_posting_is_stripped():
+    html = """<html><body><main><h1>Data Engineer</h1>
+<p>We accept all cookies to improve your experience.</p>
+<p>Own the ingestion pipelines and their SLAs.</p>
+<p>Share this job</p></main></body></html>"""
+    text = job_fetcher.html_to_text(html)
+    assert text.splitlines() == ["Data Engineer", "Own the ingestion pipelines and their SLAs."]
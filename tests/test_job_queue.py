@@ -0,0 +1,57 @@
+import time
+import asyncio
+import sqlite3
+from services.job_queue import JobQueue
+
+
+async def never_called(payload):
+    raise AssertionError("the handler should not run")
+
+
+def expire_lease(path: str, job_id: str, attempts: int):
+    # What a worker process killed mid-job leaves behind
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "UPDATE jobs SET status = 'running', attempts = ?, lease_expires = ? WHERE id = ?",
+            (attempts, time.time() - 1, job_id)
+        )
+
+
+def test_expired_leases_fail_once_attempts_are_used_up(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+
+    async def scenario():
+        queue = JobQueue(path, never_called, max_attempts=3)
+        spent = await queue.enqueue({"n": 1})
+        retried = await queue.enqueue({"n": 2})
+        expire_lease(path, spent, attempts=3)
+        expire_lease(path, retried, attempts=1)
+        claimed = await queue._run(queue._claim)
+        return claimed, await queue.get(spent), await queue.get(retried)
+
+    claimed, spent, retried = asyncio.run(scenario())
+
+    assert spent["status"] == "failed" and spent["error"] == "lease expired"
+    assert claimed["id"] == retried["job_id"] and claimed["attempts"] == 2
+    assert retried["status"] == "running"
+
+
+def test_heartbeat_survives_a_failed_renewal(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), never_called, lease_seconds=0.03)
+    renewals = []
+
+    def renew(job_id: str):
+        renewals.append(job_id)
+        if len(renewals) == 1:
+            raise sqlite3.OperationalError("database is locked")
+
+    queue._renew = renew
+
+    async def scenario():
+        heartbeat = asyncio.ensure_future(queue._heartbeat("job"))
+        await asyncio.sleep(0.1)
+        heartbeat.cancel()
+        await asyncio.gather(heartbeat, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert len(renewals) >= 2
@@ -0,0 +1,57 @@
+import time
+import asyncio
+import pytest
+from services.resilience import CircuitBreaker, CircuitOpenError, ProviderGuard
+
+
+def half_open_guard() -> ProviderGuard:
+    guard = ProviderGuard("test", requests_per_minute=6000, tokens_per_minute=600000, max_retries=0,
+                          breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.05))
+    guard.breaker.record_failure()
+    time.sleep(0.06)
+    assert guard.breaker.state == "half_open"
+    return guard
+
+
+def test_half_open_breaker_lets_a_single_probe_through():
+    guard = half_open_guard()
+    calls = []
+
+    async def slow_call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def scenario():
+        return await asyncio.gather(*(guard.call(slow_call) for _ in range(5)), return_exceptions=True)
+
+    outcomes = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert outcomes.count("ok") == 1
+    assert sum(isinstance(outcome, CircuitOpenError) for outcome in outcomes) == 4
+    assert guard.breaker.state == "closed"
+    assert asyncio.run(guard.call(slow_call)) == "ok"
+
+
+def test_cancelled_probe_lets_the_next_caller_probe():
+    guard = half_open_guard()
+
+    async def hang():
+        await asyncio.sleep(60)
+
+    async def quick():
+        return "ok"
+
+    async def scenario():
+        probe = asyncio.ensure_future(guard.call(hang))
+        await asyncio.sleep(0.01)
+        with pytest.raises(CircuitOpenError):
+            await guard.call(quick)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        return await guard.call(quick)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert guard.breaker.state == "closed"
@@ -0,0 +1,96 @@
+import asyncio
+from typing import AsyncIterator, Optional
+import pytest
+from services.admission import AdmissionController, Overloaded
+from services.base_llm_service import BaseLLMService
+from services.cache import LRUCache, TieredCache
+from services.resilience import ProviderError
+from services.router import ProviderRouter
+
+RESUME = "Jane Doe\nBackend engineer"
+JOB = "Senior Backend Engineer"
+
+
+class FakeService(BaseLLMService):
+    def __init__(self, name: str, answer: Optional[str]):
+        self.provider_name = name
+        super().__init__(model=f"{name}-model")
+        self.answer = answer
+        self.calls = 0
+
+    async def _complete(self, messages: list, response_format: Optional[dict] = None) -> str:
+        self.calls += 1
+        if self.answer is None:
+            raise ProviderError(f"{self.provider_name} unavailable")
+        return self.answer
+
+    async def _stream(self, messages: list) -> AsyncIterator[str]:
+        yield await self._complete(messages)
+
+
+@pytest.fixture(autouse=True)
+def no_retries(monkeypatch):
+    monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+
+
+def test_fallback_answers_are_cached_under_the_provider_that_answered():
+    cache = TieredCache("result", LRUCache())
+    openai, github = FakeService("openai", None), FakeService("github", "GitHub resume")
+    services = {"openai": openai, "github": github}
+    router = ProviderRouter(services, preferred="openai", cache=cache)
+
+    document = asyncio.run(router.generate_document("updated_resume", RESUME, JOB))
+
+    assert document == "GitHub resume"
+    assert asyncio.run(cache.get(router.cache_key("updated_resume", RESUME, JOB, provider=github))) == document
+    assert asyncio.run(cache.get(router.cache_key("updated_resume", RESUME, JOB, provider=openai))) is None
+
+    # The openai router still asks openai first; a router preferring github is served from the cache
+    openai.answer = "OpenAI resume"
+    assert asyncio.run(router.generate_document("updated_resume", RESUME, JOB)) == "OpenAI resume"
+    github_router = ProviderRouter(services, preferred="github", cache=cache)
+    assert asyncio.run(github_router.generate_document("updated_resume", RESUME, JOB)) == "GitHub resume"
+    assert github.calls == 1
+
+
+def test_router_has_no_provider_state_of_its_own():
+    router = ProviderRouter({"openai": FakeService("openai", "answer")})
+
+    assert not hasattr(router, "guard")
+    assert not hasattr(router, "latency")
+    assert not hasattr(router, "usage")
+    assert asyncio.run(router.complete([{"role": "user", "content": "hi"}])) == "answer"
+
+
+def test_fallback_calls_hold_a_slot_on_the_secondary_provider():
+    admission = AdmissionController(limit=1, max_queue=0)
+    services = {"openai": FakeService("openai", None), "github": FakeService("github", "GitHub answer")}
+    router = ProviderRouter(services, preferred="openai", admission=admission)
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def scenario():
+        # Another request already holds the only github slot, so the fallback is refused
+        release = await admission.gate("github").acquire()
+        with pytest.raises(Overloaded):
+            await router.complete(messages)
+        release()
+        return await router.complete(messages)
+
+    assert asyncio.run(scenario()) == "GitHub answer"
+    gate = admission.gate("github").get_stats()
+    assert gate["admitted"] == 2 and gate["in_flight"] == 0 and gate["rejected_queue_full"] == 1
+    assert "openai" not in admission.gates
+
+
+def test_inputs_fit_the_smallest_budget_a_fallback_can_reach(monkeypatch):
+    monkeypatch.setenv("OPENAI_JOB_TOKEN_BUDGET", "3000")
+    monkeypatch.setenv("GITHUB_JOB_TOKEN_BUDGET", "20")
+    services = {"openai": FakeService("openai", "answer"), "github": FakeService("github", "answer")}
+    job = "\n".join(f"Requirement {number}: five years of Python" for number in range(50))
+
+    _, compact_job, stats = ProviderRouter(services, preferred="openai").compact_inputs(RESUME, job)
+    assert 0 < stats["job_description"]["after"] <= 20
+
+    # Without fallback only the preferred provider is ever called
+    _, compact_job, _ = ProviderRouter(services, preferred="openai", fallback=False).compact_inputs(RESUME, job)
+    assert compact_job == job
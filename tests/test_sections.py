@@ -0,0 +1,65 @@
+import asyncio
+from typing import AsyncIterator, Optional
+import pytest
+from services.base_llm_service import BaseLLMService
+from services.resilience import ProviderError
+
+RESUME = """JANE DOE
+jane@example.com | Seattle
+SUMMARY
+Backend engineer with 8 years building distributed systems in Python and Go.
+EXPERIENCE
+Senior Engineer, Acme Corp
+2019 - Present
+- Built Python microservices on Kubernetes serving 10M requests per day
+Engineer, Initech
+2015 - 2019
+- Developed React dashboards for internal analytics
+SKILLS
+Python, Go, Kubernetes, React
+EDUCATION
+BSc Computer Science, State University"""
+
+JOB = """Senior Backend Engineer
+- 5+ years building Python microservices
+- Experience operating Kubernetes clusters in production
+- Familiarity with React dashboards is a plus"""
+
+
+class SectionFailingService(BaseLLMService):
+    """Answers whole-document prompts and fails every section prompt."""
+
+    provider_name = "test"
+
+    def __init__(self):
+        super().__init__(model="test-model")
+        self.prompts = []
+
+    async def _complete(self, messages: list, response_format: Optional[dict] = None) -> str:
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        if "Resume Section:" in prompt:
+            raise ProviderError("section model unavailable")
+        return "Whole tailored resume" if "Current Resume:" in prompt else "Cover letter"
+
+    async def _stream(self, messages: list) -> AsyncIterator[str]:
+        yield await self._complete(messages)
+
+
+@pytest.fixture(autouse=True)
+def quiet_breaker(monkeypatch):
+    # Every section failing must not open the circuit before the whole-resume fallback runs
+    monkeypatch.setenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "100")
+    monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+
+
+def test_all_sections_failing_falls_back_to_whole_resume():
+    service = SectionFailingService()
+    documents = asyncio.run(service.generate_documents_sections(RESUME, JOB, use_cache=False))
+
+    assert documents["updated_resume"] == "Whole tailored resume"
+    assert documents["cover_letter"] == "Cover letter"
+    assert documents["errors"] == {}
+    tailored = [section for section in documents["sections"] if section["status"] != "kept"]
+    assert tailored and all(section["status"] == "failed" for section in tailored)
+    assert sum("Current Resume:" in prompt for prompt in service.prompts) == 1
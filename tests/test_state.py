@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from services.cache import create_cache
+from services.state import RedisStateBackend
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def backend(server) -> RedisStateBackend:
+    """A backend as one worker process would have it, on its own connection to the shared server."""
+    return RedisStateBackend(fakeredis.FakeRedis(server=server))
+
+
+def test_shared_token_bucket_is_shared_across_backends(server):
+    first, second = backend(server), backend(server)
+    # 60 requests per minute: a full bucket holds 60 tokens and refills one per second
+    bucket = first.create_bucket("openai:requests", 60)
+    other = second.create_bucket("openai:requests", 60)
+
+    async def scenario():
+        await bucket.acquire(60)
+        # The other process sees the emptied bucket
+        assert second.take_tokens("openai:requests", 1, 60, 1.0) > 0.9
+        await other.drain(5)
+        return first.take_tokens("openai:requests", 1, 60, 1.0)
+
+    assert asyncio.run(scenario()) > 5.0
+
+
+def test_cache_tier_is_shared_and_expires(server, monkeypatch):
+    monkeypatch.setenv("RESULT_CACHE_TTL", "60")
+    writer = create_cache("result", state=backend(server))
+    reader = create_cache("result", state=backend(server))
+
+    asyncio.run(writer.set("key", {"document": "Tailored resume"}))
+
+    assert asyncio.run(reader.get("key")) == {"document": "Tailored resume"}
+    assert reader.stats["disk_hits"] == 1
+    client = fakeredis.FakeRedis(server=server)
+    assert 0 < client.ttl("resume-generator:cache:result:key") <= 60
+    asyncio.run(writer.delete("key"))
+    assert client.get("resume-generator:cache:result:key") is None